@@ -4,13 +4,16 @@ import altair as alt
 import os
 import glob
 import unicodedata
+import numpy as np
 import streamlit.components.v1 as components
 from datetime import datetime
 
 # Import modularized components
 from src import utils
-from src.utils import load_system_config, save_system_config, embed_local_images
+from src.utils import load_system_config, save_system_config, embed_local_images, mask_name
 from src import data_loader
+from src import filter_index
+from src import search_index
 from src import map_visualizer
 from src import report_generator
 from src import activity_logger  # Activity logging and status tracking
@@ -201,19 +204,6 @@ def get_manager_password(manager_name):
         return f"{prefix}1234"
     return "user1234"
 
-def mask_name(name):
-    """
-    Masks Korean names: 홍길동 -> 홍**, 이철 -> 이*
-    """
-    if not name or pd.isna(name):
-        return name
-    name_str = str(name)
-    if len(name_str) <= 1:
-        return name_str
-    if len(name_str) == 2:
-        return name_str[0] + "*"
-    return name_str[0] + "*" * (len(name_str) - 2) + name_str[-1]
-
 # State Update Callbacks
 def update_branch_state(name):
     # [FIX] Force NFC to match selectbox options strictly
@@ -289,6 +279,8 @@ with st.sidebar:
             uploaded_dist = st.file_uploader("영업구역 데이터 (Excel)", type="xlsx", key="dist_uploader")
 
         uploaded_zip = None
+        use_delta = False
+        delta_dir = "변동분"
         
         if data_source == "파일 업로드 (File)":
              if local_zips:
@@ -303,6 +295,10 @@ with st.sidebar:
                      uploaded_zip = st.file_uploader("인허가 데이터 (ZIP)", type="zip")
              else:
                   uploaded_zip = st.file_uploader("인허가 데이터 (ZIP)", type="zip")
+             
+             # [FEATURE] Incremental 변동분 (Delta) ingestion on top of the ZIP
+             if uploaded_zip and os.path.isdir(delta_dir):
+                 use_delta = st.toggle("변동분(Delta) 자동 반영", value=False, help="변동분 폴더의 갱신(I/U/D) 데이터를 기존 분석 결과에 증분 적용합니다.")
                  
         else: # OpenAPI
             st.info("🌐 지방행정 인허가 데이터 (LocalData)")
@@ -572,6 +568,8 @@ with st.sidebar:
 # No title here - removed 파이프라인
 
 raw_df = None
+filter_idx = None
+search_idx = None
 error = None
 
 if uploaded_dist:
@@ -584,7 +582,15 @@ if uploaded_dist:
                  dist_mtime = os.path.getmtime(uploaded_dist)
                  
              # [FIX] Unpack 3 values (df, mgr_info, error)
-             raw_df, mgr_info_list, error = data_loader.load_and_process_data(uploaded_zip, uploaded_dist, dist_mtime=dist_mtime)
+             delta_mtime = None
+             if use_delta:
+                 # Newest delta file mtime busts the cache when a new batch lands
+                 delta_files = data_loader.list_delta_files(delta_dir)
+                 delta_mtime = max((os.path.getmtime(f) for f in delta_files), default=None)
+             shared_delta_dir = delta_dir if use_delta else None
+             raw_df, mgr_info_list, error = data_loader.load_shared_dataset(uploaded_zip, uploaded_dist, shared_delta_dir, dist_mtime=dist_mtime, delta_mtime=delta_mtime)
+             filter_idx = data_loader.load_shared_filter_index(uploaded_zip, uploaded_dist, shared_delta_dir, dist_mtime=dist_mtime, delta_mtime=delta_mtime)
+             search_idx = data_loader.load_shared_search_index(uploaded_zip, uploaded_dist, shared_delta_dir, dist_mtime=dist_mtime, delta_mtime=delta_mtime)
              
     elif data_source == "OpenAPI 연동 (Auto)" and api_df is not None:
         with st.spinner("🌐 API 데이터 매칭중..."):
@@ -601,17 +607,15 @@ if error:
 
 if raw_df is not None:
     
-    # [FIX] Ensure '관리지사' has no NaNs, fill with '미지정' (Global for all sources)
-    if '관리지사' in raw_df.columns:
-        raw_df['관리지사'] = raw_df['관리지사'].fillna('미지정')
-        raw_df.loc[raw_df['관리지사'].astype(str).str.strip() == '', '관리지사'] = '미지정'
-    else:
-        raw_df['관리지사'] = '미지정'
-
-    # [FIX] Global NFC Normalization to prevent Mac/Windows mismatch
-    for col in ['관리지사', 'SP담당', '사업장명', '소재지전체주소', '영업상태명', '업태구분명']:
-        if col in raw_df.columns:
-            raw_df[col] = raw_df[col].astype(str).apply(lambda x: unicodedata.normalize('NFC', x).strip() if x else x)
+    # raw_df is shared across sessions (data_loader.load_shared_dataset): never modify it in place.
+    # '미지정' fill and NFC normalization are done by the loader.
+    
+    # Precomputed filter masks and search index (shared for file data, built per run for API data)
+    if filter_idx is None:
+        filter_idx = filter_index.build_filter_index(raw_df, type_col=data_loader.filter_type_column(raw_df),
+                                                     nfc_columns=data_loader.nfc_columns(raw_df))
+    if search_idx is None:
+        search_idx = search_index.build_search_index(raw_df, nfc_columns=data_loader.nfc_columns(raw_df))
             
     # [REFACTOR] Centralized Branch List Calculation
     custom_branch_order = ['중앙지사', '강북지사', '서대문지사', '고양지사', '의정부지사', '남양주지사', '강릉지사', '원주지사']
@@ -701,7 +705,7 @@ if raw_df is not None:
                     if 'mgr_info_list' in locals() and mgr_info_list:
                         mgr_candidates = pd.DataFrame(mgr_info_list)
                     else:
-                        mgr_candidates = raw_df.copy()
+                        mgr_candidates = raw_df.copy(deep=False)
                     
                     if sel_br_for_mgr != "전체":
                         mgr_candidates = mgr_candidates[mgr_candidates['관리지사'] == sel_br_for_mgr]
@@ -971,7 +975,7 @@ if raw_df is not None:
                     # [MOVED] Admin Log Viewer
                     st.divider()
                     st.markdown("#### 📊 관리 기록 조회 및 시각화")
-                    log_tab1, log_tab2, log_tab3 = st.tabs(["접속 로그", "활동 변경 이력", "조회 기록"])
+                    log_tab1, log_tab2, log_tab3, log_tab4 = st.tabs(["접속 로그", "활동 변경 이력", "조회 기록", "주소 매칭 리포트"])
                     
                     with log_tab1:
                         st.caption("최근 접속 로그 (최대 50건)")
@@ -983,13 +987,37 @@ if raw_df is not None:
                             st.info("로그 없음")
 
                     with log_tab2:
-                        st.caption("최근 변경 이력")
-                        change_history = activity_logger.get_change_history(limit=50)
-                        if change_history:
-                            history_df = pd.DataFrame(change_history)
-                            st.dataframe(history_df[::-1], use_container_width=True, height=200)
+                        st.caption("최근 변경 이력 (50건 단위)")
+                        h_c1, h_c2 = st.columns(2)
+                        h_record_key = h_c1.text_input("레코드 키 (사업장명_주소)", key="history_record_key").strip()
+                        h_since = h_c2.date_input("시작일", value=None, key="history_since")
+                        
+                        # Page cursors for the current query (last one is the page shown)
+                        h_query = (h_record_key, h_since)
+                        if st.session_state.get('history_query') != h_query:
+                            st.session_state.history_query = h_query
+                            st.session_state.history_cursors = [None]
+                        h_cursors = st.session_state.history_cursors
+                        
+                        history_page = activity_logger.get_change_history_page(
+                            record_key=h_record_key or None,
+                            since=h_since.strftime('%Y-%m-%d') if h_since else None,
+                            limit=50,
+                            cursor=h_cursors[-1]
+                        )
+                        if history_page['entries']:
+                            history_df = pd.DataFrame(history_page['entries'])
+                            st.dataframe(history_df, use_container_width=True, height=200)
                         else:
                             st.info("이력 없음")
+                        
+                        h_p1, h_p2 = st.columns(2)
+                        if len(h_cursors) > 1 and h_p1.button("◀ 이전", key="history_prev"):
+                            h_cursors.pop()
+                            st.rerun()
+                        if history_page['next_cursor'] is not None and h_p2.button("다음 ▶", key="history_next"):
+                            h_cursors.append(history_page['next_cursor'])
+                            st.rerun()
 
                     with log_tab3:
                         st.caption("조회 기록")
@@ -999,6 +1027,28 @@ if raw_df is not None:
                             st.dataframe(view_df[::-1], use_container_width=True, height=200)
                         else:
                             st.info("기록 없음")
+
+                    with log_tab4:
+                        match_report = raw_df.attrs.get('match_report')
+                        if match_report:
+                            st.caption(f"영업구역 주소 매칭 결과 (임계값 {match_report['threshold']})")
+                            mr1, mr2, mr3, mr4 = st.columns(4)
+                            mr1.metric("전체 행", f"{match_report['rows']:,}")
+                            mr2.metric("매칭 성공", f"{match_report['matched_rows']:,}")
+                            mr3.metric("미매칭", f"{match_report['unmatched_rows']:,}")
+                            mr4.metric("주소 없음", f"{match_report['no_address']:,}")
+                            st.caption(f"이전 매칭 재사용 {match_report['memoized_rows']:,}행 / 신규 채점 주소 {match_report['scored_addresses']:,}건")
+                            outcome_labels = {'exact': '정확 일치', 'token': '시/군구/동 일치', 'cosine': '유사도 매칭',
+                                              'below_threshold': '임계값 미달', 'no_block': '시군구 불일치',
+                                              'dong_mismatch': '동/가 불일치', 'reused': '기존 매칭 유지'}
+                            st.dataframe(pd.DataFrame([{'결과': outcome_labels.get(k, k), '행 수': v} for k, v in match_report['outcomes'].items()]),
+                                         use_container_width=True, hide_index=True)
+                            st.caption("점수 분포 (1.0 = 정확/시군구동 일치, 시군구 불일치 주소는 채점되지 않아 제외)")
+                            st.bar_chart(pd.Series(match_report['score_histogram'], name='주소 수'))
+                            st.caption("단계별 소요 시간 (초)")
+                            st.dataframe(pd.DataFrame([match_report['timings']]), use_container_width=True, hide_index=True)
+                        else:
+                            st.info("매칭 리포트 없음")
         
 
         
@@ -1023,7 +1073,7 @@ if raw_df is not None:
         selected_area_code = None
         only_hospitals = False
         only_large_area = False
-        type_col = '업태구분명' if '업태구분명' in raw_df.columns else raw_df.columns[0]
+        type_col = data_loader.filter_type_column(raw_df)
         
         # [FIX] Additional missing initializations
         sel_permit_ym = "전체"
@@ -1032,7 +1082,7 @@ if raw_df is not None:
         only_with_phone = False
         address_search = ""  # Address search filter
         
-        filter_df = raw_df.copy()
+        filter_df = raw_df
         
         # [SECURITY] Hard Filter for Manager Role
         # This ensures sidebar options are restricted even if UI logic fails.
@@ -1105,7 +1155,7 @@ if raw_df is not None:
             if has_area_code:
                     temp_df = filter_df[['영업구역 수정', 'SP담당']].dropna(subset=['SP담당']).copy()
                     # Handle potential NaN in code
-                    temp_df['영업구역 수정'] = temp_df['영업구역 수정'].fillna('')
+                    temp_df['영업구역 수정'] = temp_df['영업구역 수정'].astype(object).fillna('')
                     temp_df['label'] = temp_df.apply(lambda x: f"{x['영업구역 수정']} ({x['SP담당']})" if x['영업구역 수정'] else x['SP담당'], axis=1)
                     temp_df = temp_df.sort_values(['SP담당', '영업구역 수정'])
                     manager_opts = ["전체"] + list(temp_df['label'].unique())
@@ -1209,27 +1259,24 @@ if raw_df is not None:
                  if '폐업일자' in filter_df.columns:
                      filter_df = filter_df[filter_df['폐업일자'].dt.date >= target_date]
 
-            def get_ym_options(column):
-                if column not in raw_df.columns: return []
-                dates = raw_df[column].dropna()
-                if dates.empty: return []
-                return sorted(dates.dt.strftime('%Y-%m').unique(), reverse=True)
-
-            permit_ym_opts = ["전체"] + get_ym_options('인허가일자')
+            # Integer yyyymm keys precomputed in the filter index, shown as 'YYYY-MM'
+            permit_ym_opts = ["전체"] + filter_index.ym_options(filter_idx, '인허가일자')
             if 'sb_permit_ym' not in st.session_state: st.session_state.sb_permit_ym = "전체"
             sel_permit_ym = st.selectbox(
                 "인허가일자 (월별)", 
                 permit_ym_opts,
                 index=permit_ym_opts.index(st.session_state.get('sb_permit_ym', "전체")) if st.session_state.get('sb_permit_ym') in permit_ym_opts else 0,
+                format_func=filter_index.format_ym,
                 key="sb_permit_ym"
             )
             
-            close_ym_opts = ["전체"] + get_ym_options('폐업일자')
+            close_ym_opts = ["전체"] + filter_index.ym_options(filter_idx, '폐업일자')
             if 'sb_close_ym' not in st.session_state: st.session_state.sb_close_ym = "전체"
             sel_close_ym = st.selectbox(
                 "폐업일자 (월별)", 
                 close_ym_opts,
                 index=close_ym_opts.index(st.session_state.get('sb_close_ym', "전체")) if st.session_state.get('sb_close_ym') in close_ym_opts else 0,
+                format_func=filter_index.format_ym,
                 key="sb_close_ym"
             )
             
@@ -1323,59 +1370,46 @@ if raw_df is not None:
         st.session_state.prev_view_filters = current_filters
 
     # Data Filtering
-    base_df = raw_df.copy()
+    # Each filter is a bitmap from filter_idx; rows are only materialized once at the end
+    sel = filter_index.all_rows(filter_idx)
     
     # Get current branch selection
     current_branch_filter = st.session_state.get('sb_branch', "전체")
     
     # [REVERT] Exclude '미지정' unless explicitly selected (Previous behavior)
     if st.session_state.user_role != 'admin' or (st.session_state.user_role == 'admin' and current_branch_filter not in ["전체", "미지정"]):
-         base_df = base_df[base_df['관리지사'] != '미지정']
+         sel &= filter_index.invert(filter_idx, filter_index.values_mask(filter_idx, '관리지사', '미지정'))
         
     # Debug: show total records after 미지정 filter
     if st.session_state.user_role == 'admin':
-        st.sidebar.caption(f"🔍 전체 데이터: {len(base_df)}건 (미지정 필터 후)")
-    
-    # [FEATURE] Add 최종수정시점 column (Last Modified Date)
-    # Use the most recent date from 인허가일자 or 폐업일자, or current date if both are missing
-    def get_last_modified_date(row):
-        dates = []
-        if pd.notna(row.get('인허가일자')):
-            dates.append(row['인허가일자'])
-        if pd.notna(row.get('폐업일자')):
-            dates.append(row['폐업일자'])
-        
-        if dates:
-            return max(dates)
-        else:
-            return pd.Timestamp.now()
+        st.sidebar.caption(f"🔍 전체 데이터: {filter_index.count(sel)}건 (미지정 필터 후)")
     
-    base_df['최종수정시점'] = base_df.apply(get_last_modified_date, axis=1)
+    # 최종수정시점 (latest of 인허가일자/폐업일자) is computed once by the loader as datetime64
 
     # [SECURITY] Hard Filter for Manager Role (Main Data)
     if st.session_state.user_role == 'manager':
             if st.session_state.user_manager_code:
-                if '영업구역 수정' in base_df.columns:
-                    base_df = base_df[base_df['영업구역 수정'] == st.session_state.user_manager_code]
+                if '영업구역 수정' in raw_df.columns:
+                    sel &= filter_index.values_mask(filter_idx, '영업구역 수정', st.session_state.user_manager_code)
                 else:
-                    base_df = base_df[base_df['SP담당'] == st.session_state.user_manager_name]
+                    sel &= filter_index.values_mask(filter_idx, 'SP담당', st.session_state.user_manager_name)
             elif st.session_state.user_manager_name:
-                base_df = base_df[base_df['SP담당'] == st.session_state.user_manager_name]
+                sel &= filter_index.values_mask(filter_idx, 'SP담당', st.session_state.user_manager_name)
                 
     # [SECURITY] Hard Filter for Branch Role
     if st.session_state.user_role == 'branch':
         if st.session_state.user_branch:
              # Normalize just in case
              u_branch = unicodedata.normalize('NFC', st.session_state.user_branch)
-             base_df = base_df[base_df['관리지사'] == u_branch]
+             sel &= filter_index.values_mask(filter_idx, '관리지사', u_branch)
     
     # [FEATURE] Admin Custom Dashboard Override
     if custom_view_mode and admin_auth and (custom_view_managers or exclude_branches):
         if custom_view_managers:
-            base_df = base_df[base_df['SP담당'].isin(custom_view_managers)]
+            sel &= filter_index.values_mask(filter_idx, 'SP담당', custom_view_managers)
             
         if exclude_branches:
-            base_df = base_df[~base_df['관리지사'].isin(exclude_branches)]
+            sel &= filter_index.invert(filter_idx, filter_index.values_mask(filter_idx, '관리지사', exclude_branches))
             
         msg = "👮 관리자 지정 뷰: "
         if custom_view_managers: msg += f"담당자 {len(custom_view_managers)}명 포함"
@@ -1397,91 +1431,72 @@ if raw_df is not None:
         if current_branch_filter != "전체":
             # [FIX] Normalize comparison for Mac/Excel compatibility
             norm_sel_branch = unicodedata.normalize('NFC', current_branch_filter)
-            base_df = base_df[base_df['관리지사'] == norm_sel_branch]
+            sel &= filter_index.values_mask(filter_idx, '관리지사', norm_sel_branch)
             
             # Debug log for admin
             if st.session_state.user_role == 'admin':
-                st.sidebar.caption(f"📊 필터: {norm_sel_branch} | 결과: {len(base_df)}건")
+                st.sidebar.caption(f"📊 필터: {norm_sel_branch} | 결과: {filter_index.count(sel)}건")
             
         if selected_area_code:
-            base_df = base_df[base_df['영업구역 수정'] == selected_area_code]
+            sel &= filter_index.values_mask(filter_idx, '영업구역 수정', selected_area_code)
         elif sel_manager != "전체": 
             norm_sel_manager = unicodedata.normalize('NFC', sel_manager)
-            base_df = base_df[base_df['SP담당'] == norm_sel_manager]
+            sel &= filter_index.values_mask(filter_idx, 'SP담당', norm_sel_manager)
             
     # Common Filters (Applied to both modes)
-    if only_hospitals:
-        mask = base_df[type_col].astype(str).str.contains('병원|의원', na=False)
-        if '개방서비스명' in base_df.columns:
-            mask = mask | base_df['개방서비스명'].astype(str).str.contains('병원|의원', na=False)
-        base_df = base_df[mask]
-        
-    if only_large_area:
-        if '소재지면적' in base_df.columns:
-             base_df['temp_area'] = pd.to_numeric(base_df['소재지면적'], errors='coerce').fillna(0)
-             base_df = base_df[base_df['temp_area'] >= 330.58]
+    if only_hospitals and filter_index.flag_mask(filter_idx, 'hospital') is not None:
+        sel &= filter_index.flag_mask(filter_idx, 'hospital')
+        
+    if only_large_area and filter_index.flag_mask(filter_idx, 'large_area') is not None:
+        sel &= filter_index.flag_mask(filter_idx, 'large_area')
     
     if sel_types:
-        base_df = base_df[base_df[type_col].isin(sel_types)]
+        sel &= filter_index.values_mask(filter_idx, type_col, sel_types)
         
     if sel_permit_ym != "전체":
-        base_df = base_df[base_df['인허가일자'].dt.strftime('%Y-%m') == sel_permit_ym]
+        sel &= filter_index.ym_mask(filter_idx, '인허가일자', sel_permit_ym)
         
     if sel_close_ym != "전체":
-        base_df = base_df[base_df['폐업일자'].dt.strftime('%Y-%m') == sel_close_ym]
+        sel &= filter_index.ym_mask(filter_idx, '폐업일자', sel_close_ym)
         
-    if only_with_phone:
-        base_df = base_df[base_df['소재지전화'].notna() & (base_df['소재지전화'] != "")]
+    if only_with_phone and filter_index.flag_mask(filter_idx, 'has_phone') is not None:
+        sel &= filter_index.flag_mask(filter_idx, 'has_phone')
     
     # [FEATURE] Apply Global Date Range Filter
     # Applied to base_df so it affects ALL tabs (Map, Stats, Mobile, Grid)
     if 'global_date_range' in st.session_state and len(st.session_state.global_date_range) == 2:
         g_start, g_end = st.session_state.global_date_range
         
-        # Ensure '최종수정시점' is valid datetime (it was created via apply(), so likely mixed or timestamp)
-        # We created it at line 1342 using max() of dates or now(). It should be Timestamp.
-        # But safest to coerce just in case.
-        if '최종수정시점' in base_df.columns:
-             # Fast check type
-             if not pd.api.types.is_datetime64_any_dtype(base_df['최종수정시점']):
-                  base_df['최종수정시점'] = pd.to_datetime(base_df['최종수정시점'], errors='coerce')
-             
-             base_df = base_df[
-                 (base_df['최종수정시점'].dt.date >= g_start) & 
-                 (base_df['최종수정시점'].dt.date <= g_end)
-             ]
+        # Day numbers of '최종수정시점' are precomputed in the filter index
+        date_mask = filter_index.date_range_mask(filter_idx, g_start, g_end)
+        if date_mask is not None:
+             sel &= date_mask
              
              if st.session_state.user_role == 'admin':
-                 st.sidebar.caption(f"🗓️ 기간 필터: {g_start} ~ {g_end} ({len(base_df)}건)")
+                 st.sidebar.caption(f"🗓️ 기간 필터: {g_start} ~ {g_end} ({filter_index.count(sel)}건)")
 
+    base_pos = np.flatnonzero(filter_index.to_bool(filter_idx, sel))
     
     # [FEATURE] Address search filter - simplified with OR logic
     if address_search:
-        # Split search keywords by / or space
-        import re
-        # [FIX] Normalize input for Mac users (NFD -> NFC)
-        search_norm = unicodedata.normalize('NFC', address_search.strip())
-        keywords = re.split(r'[/\s]+', search_norm)
-        keywords = [k for k in keywords if k]  # Remove empty strings
+        # Split search keywords by / or space (NFC-normalized for Mac input)
+        keywords = search_index.split_keywords(address_search)
         
         if keywords:
-            # Create a mask that checks if ANY keyword is present (OR logic)
-            mask = pd.Series([False] * len(base_df), index=base_df.index)
-            for keyword in keywords:
-                keyword_mask = (
-                    base_df['소재지전체주소'].astype(str).apply(lambda x: unicodedata.normalize('NFC', x)).str.contains(keyword, case=False, na=False, regex=False) |
-                    base_df['사업장명'].astype(str).apply(lambda x: unicodedata.normalize('NFC', x)).str.contains(keyword, case=False, na=False, regex=False)
-                )
-                mask = mask | keyword_mask  # OR logic: any keyword match
-            base_df = base_df[mask]
+            # Bigram index lookup: rows matching ANY keyword (OR logic)
+            hits = search_index.search(search_idx, keywords, mode='or')
+            base_pos = base_pos[hits[base_pos]]
             
             # Debug: Search Result Count for Admin
             if st.session_state.user_role == 'admin':
-                 st.sidebar.caption(f"🔎 검색 결과: {len(base_df)}건")
+                 st.sidebar.caption(f"🔎 검색 결과: {len(base_pos)}건")
+    
+    base_df = raw_df.take(base_pos)
         
-    df = base_df.copy()
+    df = base_df.copy(deep=False)
     if sel_status != "전체":
-        df = df[df['영업상태명'] == sel_status]
+        status_rows = filter_index.to_bool(filter_idx, filter_index.values_mask(filter_idx, '영업상태명', sel_status))
+        df = raw_df.take(base_pos[status_rows[base_pos]])
 
     # Edit Mode
     # Edit Mode
@@ -1501,9 +1516,9 @@ if raw_df is not None:
         ignore_global = st.checkbox("🔓 Sidebar 공통 필터 무시 (전체 데이터 불러오기)", value=False, help="체크 시 사이드바의 필터를 무시하고 전체 데이터를 대상으로 검색합니다.")
         
         if ignore_global:
-            edit_target_df = raw_df.copy()
+            edit_target_df = raw_df
         else:
-            edit_target_df = df.copy()
+            edit_target_df = df
             
         c_e1, c_e2 = st.columns(2)
         
@@ -1546,8 +1561,9 @@ if raw_df is not None:
         editable_cols = ['관리지사', '영업구역 수정']
         disabled_cols = [c for c in cols_to_show if c not in editable_cols]
         
+        # Editable columns are categorical in raw_df; edit them as plain text
         edited_df = st.data_editor(
-            edit_target_df[cols_to_show],
+            edit_target_df[cols_to_show].astype({c: object for c in editable_cols if c in cols_to_show}),
             column_config=column_config,
             use_container_width=True,
             num_rows="fixed",
@@ -1687,31 +1703,30 @@ if raw_df is not None:
                 # This bypasses any Sidebar lag that might have filtered base_df to the wrong branch. (e.g. Gangbuk)
                 
                 # 1. Start with Raw (but respect Role!)
-                mgr_df = raw_df[raw_df['관리지사'].astype(str).apply(lambda x: unicodedata.normalize('NFC', x)) == current_br_name].copy()
+                # Filter index keys are NFC-normalized, so the lookup matches regardless of source form
+                mgr_sel = filter_index.values_mask(filter_idx, '관리지사', current_br_name)
                 
                 # [SECURITY] Re-Apply Manager Filter here because we started from raw_df
                 if st.session_state.user_role == 'manager':
                     if st.session_state.user_manager_code:
-                        if '영업구역 수정' in mgr_df.columns:
-                            mgr_df = mgr_df[mgr_df['영업구역 수정'] == st.session_state.user_manager_code]
+                        if '영업구역 수정' in raw_df.columns:
+                            mgr_sel &= filter_index.values_mask(filter_idx, '영업구역 수정', st.session_state.user_manager_code)
                         else:
-                            mgr_df = mgr_df[mgr_df['SP담당'] == st.session_state.user_manager_name]
+                            mgr_sel &= filter_index.values_mask(filter_idx, 'SP담당', st.session_state.user_manager_name)
                     elif st.session_state.user_manager_name:
-                        mgr_df = mgr_df[mgr_df['SP담당'] == st.session_state.user_manager_name]
+                        mgr_sel &= filter_index.values_mask(filter_idx, 'SP담당', st.session_state.user_manager_name)
                 
                 # 2. Re-apply Common Filters (Date, Type, Status) if they exist
                 # This ensures the manager view is still relevant, just correctly branched.
                 if sel_permit_ym != "전체":
-                    mgr_df = mgr_df[mgr_df['인허가일자'].dt.strftime('%Y-%m') == sel_permit_ym]
+                    mgr_sel &= filter_index.ym_mask(filter_idx, '인허가일자', sel_permit_ym)
                 if sel_close_ym != "전체":
-                    mgr_df = mgr_df[mgr_df['폐업일자'].dt.strftime('%Y-%m') == sel_close_ym]
+                    mgr_sel &= filter_index.ym_mask(filter_idx, '폐업일자', sel_close_ym)
                 if sel_status != "전체":
-                    mgr_df = mgr_df[mgr_df['영업상태명'] == sel_status]
-                if only_hospitals:
-                    mask = mgr_df[type_col].astype(str).str.contains('병원|의원', na=False)
-                    if '개방서비스명' in mgr_df.columns:
-                        mask = mask | mgr_df['개방서비스명'].astype(str).str.contains('병원|의원', na=False)
-                    mgr_df = mgr_df[mask]
+                    mgr_sel &= filter_index.values_mask(filter_idx, '영업상태명', sel_status)
+                if only_hospitals and filter_index.flag_mask(filter_idx, 'hospital') is not None:
+                    mgr_sel &= filter_index.flag_mask(filter_idx, 'hospital')
+                mgr_df = raw_df[filter_index.to_bool(filter_idx, mgr_sel)]
             else:
                 mgr_df = base_df.copy()
                 
@@ -1724,7 +1739,7 @@ if raw_df is not None:
                 temp_g = temp_g.dropna(subset=['SP담당'])
                 temp_g = temp_g[temp_g['SP담당'] != '미지정']
                 
-                temp_g['영업구역 수정'] = temp_g['영업구역 수정'].fillna('')
+                temp_g['영업구역 수정'] = temp_g['영업구역 수정'].astype(object).fillna('')
                 
                 # [UX] Sort by Name first to match Sidebar order, then Code.
                 # This makes it easier to find people.
@@ -1824,6 +1839,9 @@ if raw_df is not None:
                         series = ai_df[col_name]
                         if not pd.api.types.is_datetime64_any_dtype(series):
                             series = pd.to_datetime(series, errors='coerce')
+                        if col_name == '최종수정시점':
+                            # Missing 최종수정시점 means "now" (see data_loader)
+                            series = series.fillna(ai_now)
                         return len(series[series >= ai_cutoff])
                     return 0
 
@@ -2081,7 +2099,9 @@ if raw_df is not None:
             st.divider()
             
             st.markdown("##### 👤 영업담당별 실적 Top 10")
-            mgr_counts = df['SP담당'].value_counts().head(10).reset_index()
+            # SP담당 is categorical: drop the other managers' zero-count categories
+            mgr_counts = df['SP담당'].value_counts()
+            mgr_counts = mgr_counts[mgr_counts > 0].head(10).reset_index()
             mgr_counts.columns = ['SP담당', 'count']
             
             mgr_chart = alt.Chart(mgr_counts).mark_bar(color="#4DB6AC", cornerRadiusTopRight=5, cornerRadiusBottomRight=5).encode(
@@ -2124,9 +2144,8 @@ if raw_df is not None:
         keyword = st.text_input("검색", placeholder="업체명 또는 주소...")
             
         # Use base_df instead of df to show all statuses (including closed)
-        m_df = base_df.copy()
-        
-        if keyword: m_df = m_df[m_df['사업장명'].str.contains(keyword, na=False) | m_df['소재지전체주소'].str.contains(keyword, na=False)]
+        # Keywords must all match (AND), looked up in the shared search index
+        m_df = search_index.filter_frame(search_idx, base_df, search_index.split_keywords(keyword), mode='and')
         
         st.caption(f"조회 결과: {len(m_df):,}건")
         
@@ -2202,20 +2221,11 @@ if raw_df is not None:
         
         start_row_count = len(grid_df)
         
-        # Add activity status and notes from storage
-        grid_df['record_key'] = grid_df.apply(lambda row: activity_logger.get_record_key(row), axis=1)
-        grid_df['활동진행상태'] = grid_df['record_key'].apply(
-            lambda k: activity_logger.get_activity_status(k).get('활동진행상태', '')
-        ).astype(str)  # Convert to string
-        grid_df['특이사항'] = grid_df['record_key'].apply(
-            lambda k: activity_logger.get_activity_status(k).get('특이사항', '')
-        ).astype(str)  # Convert to string
-        grid_df['상태변경일시'] = grid_df['record_key'].apply(
-            lambda k: activity_logger.get_activity_status(k).get('변경일시', '')
-        ).astype(str)  # Convert to string
-        grid_df['상태변경자'] = grid_df['record_key'].apply(
-            lambda k: activity_logger.get_activity_status(k).get('변경자', '')
-        ).astype(str)  # Convert to string
+        # Add activity status and notes from storage (one bulk lookup, joined on record_key)
+        grid_df['record_key'] = activity_logger.get_record_keys(grid_df)
+        statuses = activity_logger.get_statuses(grid_df['record_key']).astype(str)  # Convert to string
+        statuses = statuses.rename(columns={'변경일시': '상태변경일시', '변경자': '상태변경자'})
+        grid_df = grid_df.join(statuses, on='record_key')
         
         if '인허가일자' in grid_df.columns:
             grid_df['인허가일자'] = grid_df['인허가일자'].apply(lambda x: x.strftime('%Y-%m-%d') if pd.notna(x) else "")
@@ -2323,10 +2333,7 @@ if raw_df is not None:
             grid_df = grid_df[grid_df['활동진행상태'].isin(sel_grid_status)]
             
         if grid_search_kw:
-            grid_df = grid_df[
-                grid_df['사업장명'].astype(str).str.contains(grid_search_kw, na=False) | 
-                grid_df['소재지전체주소'].astype(str).str.contains(grid_search_kw, na=False)
-            ]
+            grid_df = search_index.filter_frame(search_idx, grid_df, search_index.split_keywords(grid_search_kw), mode='and')
             
         st.divider()
 
@@ -2375,18 +2382,9 @@ if raw_df is not None:
         col1, col2 = st.columns([1, 4])
         with col1:
             if st.button("💾 변경사항 저장", use_container_width=True):
-                saved_count = 0
-                for idx, row in edited_df.iterrows():
-                    orig_row = df_display.iloc[idx]
-                    if (row['활동진행상태'] != orig_row['활동진행상태'] or 
-                        row['특이사항'] != orig_row['특이사항']):
-                        activity_logger.save_activity_status(
-                            row['record_key'],
-                            row['활동진행상태'],
-                            row['특이사항'],
-                            current_user
-                        )
-                        saved_count += 1
+                # Vectorized diff against the displayed rows, saved in one write
+                changes = activity_logger.changed_statuses(df_display, edited_df)
+                saved_count = activity_logger.save_activity_statuses_bulk(changes, current_user)
                 
                 if saved_count > 0:
                     st.success(f"✅ {saved_count}건의 변경사항이 저장되었습니다!")
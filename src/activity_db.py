@@ -0,0 +1,330 @@
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+import pandas as pd
+from src import event_log
+from src.config import ACCESS_LOG_KEEP, VIEW_LOG_KEEP, CHANGE_HISTORY_KEEP
+
+# SQLite backend for activity_logger (activity status, change history, access/view logs).
+# WAL mode lets readers run alongside a writer; every event is one small transaction.
+BASE_DIR = Path(os.path.abspath(__file__)).parent.parent
+STORAGE_DIR = BASE_DIR / "storage"
+DB_FILE = STORAGE_DIR / "activity.db"
+
+# Log tables are trimmed to the config *_KEEP row counts every PRUNE_EVERY inserts
+PRUNE_EVERY = 100
+
+# Bumped with each schema change (stored as PRAGMA user_version)
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS activity_status (
+    record_key TEXT PRIMARY KEY,
+    status TEXT,
+    notes TEXT,
+    changed_at TEXT,
+    changed_by TEXT
+);
+CREATE TABLE IF NOT EXISTS change_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT,
+    record_key TEXT,
+    user TEXT,
+    old_status TEXT,
+    new_status TEXT,
+    old_notes TEXT,
+    new_notes TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_change_history_record_key ON change_history (record_key);
+CREATE INDEX IF NOT EXISTS idx_change_history_timestamp ON change_history (timestamp);
+CREATE TABLE IF NOT EXISTS access_logs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT,
+    user_role TEXT,
+    user_name TEXT,
+    action TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_access_logs_timestamp ON access_logs (timestamp);
+CREATE TABLE IF NOT EXISTS view_logs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT,
+    user_role TEXT,
+    user_name TEXT,
+    target TEXT,
+    details TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_view_logs_timestamp ON view_logs (timestamp);
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value INTEGER
+);
+"""
+
+# Status dict keys (as returned by activity_logger) <-> activity_status columns
+STATUS_COLUMNS = {"활동진행상태": "status", "특이사항": "notes", "변경일시": "changed_at", "변경자": "changed_by"}
+
+HISTORY_FIELDS = ["timestamp", "record_key", "user", "old_status", "new_status", "old_notes", "new_notes"]
+ACCESS_FIELDS = ["timestamp", "user_role", "user_name", "action"]
+VIEW_FIELDS = ["timestamp", "user_role", "user_name", "target", "details"]
+
+# One connection per thread and database file (sqlite3 connections are not shared across threads)
+_local = threading.local()
+
+
+def _connect():
+    """Connection for the current thread, creating and migrating the database on first use"""
+    conns = getattr(_local, 'conns', None)
+    if conns is None:
+        conns = _local.conns = {}
+    conn = conns.get(DB_FILE)
+    if conn is None:
+        DB_FILE.parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit mode; transactions are opened explicitly with BEGIN IMMEDIATE
+        conn = sqlite3.connect(DB_FILE, timeout=30, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        _init_schema(conn)
+        conns[DB_FILE] = conn
+    return conn
+
+
+def _init_schema(conn):
+    if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+        return
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Re-check under the write lock: another process may have just migrated
+        if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            # executescript would commit the open transaction, so run statements one by one
+            for statement in SCHEMA.split(';'):
+                if statement.strip():
+                    conn.execute(statement)
+            _migrate_json(conn, DB_FILE.parent)
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def _load_json(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"Activity DB migration error ({path.name}): {e}")
+        return None
+
+
+def _migrate_json(conn, storage_dir):
+    """One-time import of the files written by the JSON backend (the files are left in place)"""
+    statuses = _load_json(storage_dir / "activity_status.json") if (storage_dir / "activity_status.json").exists() else None
+    if isinstance(statuses, dict):
+        conn.executemany(
+            "INSERT OR REPLACE INTO activity_status VALUES (?, ?, ?, ?, ?)",
+            [(key, *(s.get(field, "") for field in STATUS_COLUMNS)) for key, s in statuses.items() if isinstance(s, dict)],
+        )
+    for name, table, fields in [("change_history.json", "change_history", HISTORY_FIELDS),
+                                ("access_logs.json", "access_logs", ACCESS_FIELDS),
+                                ("view_logs.json", "view_logs", VIEW_FIELDS)]:
+        # JSONL logs (with rotated segments) if present, else the legacy JSON list
+        entries = event_log.read_all((storage_dir / name).with_suffix('.jsonl'))
+        if not entries and (storage_dir / name).exists():
+            entries = _load_json(storage_dir / name)
+        if isinstance(entries, list):
+            _insert_rows(conn, table, fields, [e for e in entries if isinstance(e, dict)])
+
+
+def _insert_rows(conn, table, fields, entries):
+    conn.executemany(
+        f"INSERT INTO {table} ({', '.join(fields)}) VALUES ({', '.join('?' * len(fields))})",
+        [tuple(e.get(field, "") for field in fields) for e in entries],
+    )
+
+
+def _prune(conn, table, last_id, keep):
+    """Trim a log table to its newest `keep` rows, once every PRUNE_EVERY inserts"""
+    if last_id % PRUNE_EVERY == 0:
+        conn.execute(f"DELETE FROM {table} WHERE id <= ?", (last_id - keep,))
+
+
+def _append(table, fields, entry, keep):
+    conn = _connect()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        cur = conn.execute(
+            f"INSERT INTO {table} ({', '.join(fields)}) VALUES ({', '.join('?' * len(fields))})",
+            tuple(entry.get(field, "") for field in fields),
+        )
+        _prune(conn, table, cur.lastrowid, keep)
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def _tail(table, fields, limit):
+    """Newest `limit` rows, returned oldest first (same order as the JSON lists)"""
+    rows = _connect().execute(
+        f"SELECT {', '.join(fields)} FROM {table} ORDER BY id DESC LIMIT ?", (limit,)
+    ).fetchall()
+    return [dict(zip(fields, row)) for row in reversed(rows)]
+
+
+# ===== ACCESS / VIEW LOGS =====
+
+def log_access(entry):
+    _append("access_logs", ACCESS_FIELDS, entry, ACCESS_LOG_KEEP)
+
+
+def get_access_logs(limit):
+    return _tail("access_logs", ACCESS_FIELDS, limit)
+
+
+def log_view(entry):
+    _append("view_logs", VIEW_FIELDS, entry, VIEW_LOG_KEEP)
+
+
+def get_view_logs(limit):
+    return _tail("view_logs", VIEW_FIELDS, limit)
+
+
+# ===== ACTIVITY STATUS =====
+
+def status_version():
+    """Counter bumped by every status write, from any process (for caching the status table)"""
+    row = _connect().execute("SELECT value FROM meta WHERE name = 'status_version'").fetchone()
+    return row[0] if row else 0
+
+
+def get_activity_status(record_key):
+    """Status dict for a record, or None if it has none"""
+    row = _connect().execute(
+        f"SELECT {', '.join(STATUS_COLUMNS.values())} FROM activity_status WHERE record_key = ?", (record_key,)
+    ).fetchone()
+    return dict(zip(STATUS_COLUMNS, row)) if row else None
+
+
+def load_status_frame():
+    """The whole status table as a DataFrame indexed by record_key (activity_logger.STATUS_FIELDS columns)"""
+    rows = _connect().execute(
+        f"SELECT record_key, {', '.join(STATUS_COLUMNS.values())} FROM activity_status"
+    ).fetchall()
+    frame = pd.DataFrame([row[1:] for row in rows], columns=list(STATUS_COLUMNS),
+                         index=pd.Index([row[0] for row in rows], name='record_key', dtype=object))
+    return frame.fillna("")
+
+
+def save_activity_status(record_key, new_data, history_entry):
+    """
+    Upserts a record's status and, if history_entry(old_data) returns an entry, appends
+    it to change_history, all in one transaction. Returns the previous status dict.
+    """
+    conn = _connect()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        row = conn.execute(
+            f"SELECT {', '.join(STATUS_COLUMNS.values())} FROM activity_status WHERE record_key = ?", (record_key,)
+        ).fetchone()
+        old_data = dict(zip(STATUS_COLUMNS, row)) if row else {}
+        conn.execute(
+            "INSERT OR REPLACE INTO activity_status VALUES (?, ?, ?, ?, ?)",
+            (record_key, *(new_data.get(field, "") for field in STATUS_COLUMNS)),
+        )
+        conn.execute(
+            "INSERT INTO meta VALUES ('status_version', 1) ON CONFLICT(name) DO UPDATE SET value = value + 1"
+        )
+        entry = history_entry(old_data)
+        if entry:
+            cur = conn.execute(
+                f"INSERT INTO change_history ({', '.join(HISTORY_FIELDS)}) VALUES ({', '.join('?' * len(HISTORY_FIELDS))})",
+                tuple(entry.get(field, "") for field in HISTORY_FIELDS),
+            )
+            _prune(conn, "change_history", cur.lastrowid, CHANGE_HISTORY_KEEP)
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return old_data
+
+
+def save_activity_statuses_bulk(updates, history_entry):
+    """
+    save_activity_status for many records in one transaction. updates is a list of
+    (record_key, new_data); history_entry(record_key, old_data, new_data) returns an
+    entry or None.
+    """
+    if not updates:
+        return
+    conn = _connect()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        keys = [key for key, _ in updates]
+        old = {}
+        # Stay under SQLite's bound-parameter limit
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            for row in conn.execute(
+                f"SELECT record_key, {', '.join(STATUS_COLUMNS.values())} FROM activity_status "
+                f"WHERE record_key IN ({', '.join('?' * len(chunk))})", chunk
+            ):
+                old[row[0]] = dict(zip(STATUS_COLUMNS, row[1:]))
+        conn.executemany(
+            "INSERT OR REPLACE INTO activity_status VALUES (?, ?, ?, ?, ?)",
+            [(key, *(new_data.get(field, "") for field in STATUS_COLUMNS)) for key, new_data in updates],
+        )
+        conn.execute(
+            "INSERT INTO meta VALUES ('status_version', 1) ON CONFLICT(name) DO UPDATE SET value = value + 1"
+        )
+        entries = [history_entry(key, old.get(key, {}), new_data) for key, new_data in updates]
+        entries = [e for e in entries if e]
+        if entries:
+            _insert_rows(conn, "change_history", HISTORY_FIELDS, entries)
+            last_id = conn.execute("SELECT MAX(id) FROM change_history").fetchone()[0]
+            conn.execute("DELETE FROM change_history WHERE id <= ?", (last_id - CHANGE_HISTORY_KEEP,))
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+# ===== CHANGE HISTORY =====
+
+def log_change_history(entry):
+    _append("change_history", HISTORY_FIELDS, entry, CHANGE_HISTORY_KEEP)
+
+
+def get_change_history_page(record_key, since, limit, cursor):
+    """
+    Newest-first page of change history using the record_key / timestamp indexes.
+    cursor is the id of the last row of the previous page.
+    """
+    where, params = [], []
+    if record_key:
+        where.append("record_key = ?")
+        params.append(record_key)
+    if since:
+        where.append("timestamp >= ?")
+        params.append(since)
+    if cursor is not None:
+        where.append("id < ?")
+        params.append(cursor)
+    rows = _connect().execute(
+        f"SELECT id, {', '.join(HISTORY_FIELDS)} FROM change_history"
+        f"{' WHERE ' + ' AND '.join(where) if where else ''} ORDER BY id DESC LIMIT ?",
+        (*params, limit + 1),
+    ).fetchall()
+    next_cursor = rows[limit - 1][0] if len(rows) > limit else None
+    return [dict(zip(HISTORY_FIELDS, row[1:])) for row in rows[:limit]], next_cursor
+
+
+def get_change_history(record_key, limit):
+    if record_key:
+        rows = _connect().execute(
+            f"SELECT {', '.join(HISTORY_FIELDS)} FROM change_history WHERE record_key = ? ORDER BY id DESC LIMIT ?",
+            (record_key, limit),
+        ).fetchall()
+        return [dict(zip(HISTORY_FIELDS, row)) for row in reversed(rows)]
+    return _tail("change_history", HISTORY_FIELDS, limit)
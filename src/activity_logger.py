@@ -1,7 +1,11 @@
 import json
 import os
+import threading
 from datetime import datetime
 from pathlib import Path
+import pandas as pd
+from src import activity_db, event_log
+from src.config import ACTIVITY_BACKEND
 
 # Storage directory
 # Use absolute path resolution to avoid issues with Streamlit execution context
@@ -13,6 +17,17 @@ ACCESS_LOG_FILE = STORAGE_DIR / "access_logs.json"
 ACTIVITY_STATUS_FILE = STORAGE_DIR / "activity_status.json"
 CHANGE_HISTORY_FILE = STORAGE_DIR / "change_history.json"
 
+# 'sqlite' (src.activity_db, WAL) or 'json': activity_status.json plus append-only
+# JSONL logs (src.event_log) next to the legacy log files above
+BACKEND = ACTIVITY_BACKEND
+
+# JSONL logs already converted from their legacy JSON list this process
+_migrated_logs = set()
+
+
+def _use_db():
+    return BACKEND == 'sqlite'
+
 
 def load_json_file(filepath):
     """Load JSON file, return empty dict/list if not exists"""
@@ -31,12 +46,19 @@ def save_json_file(filepath, data):
         json.dump(data, f, ensure_ascii=False, indent=2)
 
 
+def _log_file(json_path):
+    """JSONL log for a legacy JSON list file, converted from it on first use"""
+    path = json_path.with_suffix('.jsonl')
+    if path not in _migrated_logs:
+        event_log.migrate_json_list(json_path, path)
+        _migrated_logs.add(path)
+    return path
+
+
 # ===== ACCESS LOGGING =====
 
 def log_access(user_role, user_name, action="login"):
     """Log user access"""
-    logs = load_json_file(ACCESS_LOG_FILE)
-    
     log_entry = {
         "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
         "user_role": user_role,
@@ -44,45 +66,116 @@ def log_access(user_role, user_name, action="login"):
         "action": action
     }
     
-    logs.append(log_entry)
+    if _use_db():
+        activity_db.log_access(log_entry)
+        return
     
-    # Keep only last 1000 entries
-    if len(logs) > 1000:
-        logs = logs[-1000:]
-    
-    save_json_file(ACCESS_LOG_FILE, logs)
+    event_log.append(_log_file(ACCESS_LOG_FILE), [log_entry])
 
 
 def get_access_logs(limit=100):
     """Get recent access logs"""
-    logs = load_json_file(ACCESS_LOG_FILE)
-    return logs[-limit:] if logs else []
+    if _use_db():
+        return activity_db.get_access_logs(limit)
+    return event_log.tail(_log_file(ACCESS_LOG_FILE), limit)
 
 
 # ===== ACTIVITY STATUS =====
 
+STATUS_FIELDS = ["활동진행상태", "특이사항", "변경일시", "변경자"]
+
+# In-process copy of the statuses, reloaded only when its stamp changes: the file's
+# (mtime, size) for JSON, activity_db.status_version() for SQLite. 'statuses' is the
+# JSON dict keyed by record_key, 'frame' the same data as a DataFrame.
+_status_cache = {"stamp": None, "statuses": {}, "frame": None}
+_status_lock = threading.Lock()
+
+
+def _file_stamp(filepath):
+    try:
+        st = filepath.stat()
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _load_statuses():
+    """All statuses (record_key -> dict), parsed from disk only if the file changed"""
+    stamp = _file_stamp(ACTIVITY_STATUS_FILE)
+    with _status_lock:
+        if stamp is None or stamp != _status_cache["stamp"]:
+            _status_cache["statuses"] = load_json_file(ACTIVITY_STATUS_FILE) if stamp else {}
+            _status_cache["stamp"] = stamp
+            _status_cache["frame"] = None
+        return _status_cache["statuses"]
+
+
+def _store_statuses(statuses):
+    """Write statuses and keep the cache in step with the file just written"""
+    save_json_file(ACTIVITY_STATUS_FILE, statuses)
+    with _status_lock:
+        _status_cache["statuses"] = statuses
+        _status_cache["stamp"] = _file_stamp(ACTIVITY_STATUS_FILE)
+        _status_cache["frame"] = None
+
+
+def _status_frame():
+    """Cached statuses as a DataFrame indexed by record_key"""
+    if _use_db():
+        stamp = ("db", str(activity_db.DB_FILE), activity_db.status_version())
+        with _status_lock:
+            if stamp != _status_cache["stamp"] or _status_cache["frame"] is None:
+                _status_cache["stamp"] = stamp
+                _status_cache["statuses"] = None
+                _status_cache["frame"] = activity_db.load_status_frame()
+            return _status_cache["frame"]
+    
+    statuses = _load_statuses()
+    with _status_lock:
+        if _status_cache["frame"] is None or _status_cache["statuses"] is not statuses:
+            frame = pd.DataFrame(
+                [[status.get(field, "") for field in STATUS_FIELDS] for status in statuses.values()],
+                index=pd.Index(list(statuses), name='record_key', dtype=object),
+                columns=STATUS_FIELDS,
+            )
+            _status_cache["frame"] = frame
+        return _status_cache["frame"]
+
+
 def get_record_key(row):
     """Generate unique key for a record"""
     return f"{row.get('사업장명', '')}_{row.get('소재지전체주소', '')}"
 
 
+def get_record_keys(df):
+    """get_record_key for every row of a DataFrame, as a Series"""
+    parts = [df[col].astype(str) if col in df.columns else pd.Series('', index=df.index)
+             for col in ('사업장명', '소재지전체주소')]
+    return parts[0] + "_" + parts[1]
+
+
 def get_activity_status(record_key):
     """Get activity status for a record"""
-    statuses = load_json_file(ACTIVITY_STATUS_FILE)
-    return statuses.get(record_key, {
-        "활동진행상태": "",
-        "특이사항": "",
-        "변경일시": "",
-        "변경자": ""
-    })
+    if _use_db():
+        status = activity_db.get_activity_status(record_key)
+    else:
+        status = _load_statuses().get(record_key)
+    if status is None:
+        return {field: "" for field in STATUS_FIELDS}
+    return dict(status)
+
+
+def get_statuses(keys):
+    """
+    Activity statuses for many records in one call: a DataFrame indexed by the
+    unique record_keys with STATUS_FIELDS columns ("" for records without a status).
+    """
+    keys = pd.Index(pd.unique(pd.Series(keys, dtype=object)), name='record_key')
+    return _status_frame().reindex(keys, fill_value="")
 
 
 def save_activity_status(record_key, status, notes, user_name):
     """Save activity status for a record"""
-    statuses = load_json_file(ACTIVITY_STATUS_FILE)
-    
-    old_data = statuses.get(record_key, {})
-    
     new_data = {
         "활동진행상태": status,
         "특이사항": notes,
@@ -90,19 +183,81 @@ def save_activity_status(record_key, status, notes, user_name):
         "변경자": user_name
     }
     
+    if _use_db():
+        # Status and history entry are written in one transaction
+        activity_db.save_activity_status(
+            record_key, new_data,
+            lambda old_data: _change_entry(record_key, old_data, new_data, user_name)
+            if _is_change(old_data, status, notes) else None
+        )
+        return
+    
+    statuses = dict(_load_statuses())
+    old_data = statuses.get(record_key, {})
     statuses[record_key] = new_data
-    save_json_file(ACTIVITY_STATUS_FILE, statuses)
+    _store_statuses(statuses)
     
     # Log change history
-    if old_data.get("활동진행상태") != status or old_data.get("특이사항") != notes:
+    if _is_change(old_data, status, notes):
         log_change_history(record_key, old_data, new_data, user_name)
 
 
-def log_change_history(record_key, old_data, new_data, user_name):
-    """Log change to history"""
-    history = load_json_file(CHANGE_HISTORY_FILE)
+def changed_statuses(original, edited):
+    """
+    Rows of the edited grid whose 활동진행상태 or 특이사항 differ from the original
+    (both DataFrames share the same index), as record_key / 활동진행상태 / 특이사항.
+    Missing values count as "".
+    """
+    cols = ["활동진행상태", "특이사항"]
+    before = original[cols].reindex(edited.index).fillna("").astype(str)
+    after = edited[cols].fillna("").astype(str)
+    changed = (before != after).any(axis=1)
+    return pd.concat([edited.loc[changed, ["record_key"]], after[changed]], axis=1)
+
+
+def save_activity_statuses_bulk(changes, user_name):
+    """
+    Save many status edits at once (a DataFrame with record_key, 활동진행상태 and
+    특이사항, e.g. from changed_statuses). Statuses and history are each written
+    once (one transaction on SQLite). Returns the number of records saved.
+    """
+    changes = changes.drop_duplicates('record_key', keep='last')
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    updates = [
+        (key, {"활동진행상태": status, "특이사항": notes, "변경일시": now, "변경자": user_name})
+        for key, status, notes in zip(changes['record_key'], changes['활동진행상태'], changes['특이사항'])
+    ]
+    
+    def history_entry(key, old_data, new_data):
+        if _is_change(old_data, new_data["활동진행상태"], new_data["특이사항"]):
+            return _change_entry(key, old_data, new_data, user_name)
+        return None
     
-    change_entry = {
+    if _use_db():
+        activity_db.save_activity_statuses_bulk(updates, history_entry)
+        return len(updates)
+    
+    if not updates:
+        return 0
+    statuses = dict(_load_statuses())
+    entries = []
+    for key, new_data in updates:
+        entry = history_entry(key, statuses.get(key, {}), new_data)
+        if entry:
+            entries.append(entry)
+        statuses[key] = new_data
+    _store_statuses(statuses)
+    
+    event_log.append(_log_file(CHANGE_HISTORY_FILE), entries)
+    return len(updates)
+
+
+def _is_change(old_data, status, notes):
+    return old_data.get("활동진행상태") != status or old_data.get("특이사항") != notes
+
+
+def _change_entry(record_key, old_data, new_data, user_name):
+    return {
         "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
         "record_key": record_key,
         "user": user_name,
@@ -111,24 +266,44 @@ def log_change_history(record_key, old_data, new_data, user_name):
         "old_notes": old_data.get("특이사항", ""),
         "new_notes": new_data.get("특이사항", "")
     }
+
+
+def log_change_history(record_key, old_data, new_data, user_name):
+    """Log change to history"""
+    change_entry = _change_entry(record_key, old_data, new_data, user_name)
+    if _use_db():
+        activity_db.log_change_history(change_entry)
+        return
     
-    history.append(change_entry)
-    
-    # Keep only last 5000 entries
-    if len(history) > 5000:
-        history = history[-5000:]
-    
-    save_json_file(CHANGE_HISTORY_FILE, history)
+    event_log.append(_log_file(CHANGE_HISTORY_FILE), [change_entry])
 
 
 def get_change_history(record_key=None, limit=100):
     """Get change history, optionally filtered by record_key"""
-    history = load_json_file(CHANGE_HISTORY_FILE)
+    if _use_db():
+        return activity_db.get_change_history(record_key, limit)
     
+    path = _log_file(CHANGE_HISTORY_FILE)
     if record_key:
-        history = [h for h in history if h.get("record_key") == record_key]
+        entries, _ = event_log.keyed_page(path, "record_key", record_key, limit)
+        return entries[::-1]
+    
+    return event_log.tail(path, limit)
+
+
+def get_change_history_page(record_key=None, since=None, limit=50, cursor=None):
+    """
+    One page of change history, newest first: {"entries": [...], "next_cursor": ...}.
+    since keeps entries with timestamp >= since ('YYYY-MM-DD[ HH:MM:SS]'); pass the
+    previous page's next_cursor as cursor for the next page (None when there is none).
+    """
+    if _use_db():
+        entries, next_cursor = activity_db.get_change_history_page(record_key, since, limit, cursor)
+        return {"entries": entries, "next_cursor": next_cursor}
     
-    return history[-limit:] if history else []
+    entries, next_cursor = event_log.keyed_page(_log_file(CHANGE_HISTORY_FILE), "record_key", record_key or None,
+                                                limit, cursor, since)
+    return {"entries": entries, "next_cursor": next_cursor}
 
 
 # ===== VIEW LOGGING =====
@@ -137,8 +312,6 @@ VIEW_LOG_FILE = STORAGE_DIR / "view_logs.json"
 
 def log_view(user_role, user_name, target, details):
     """Log view/search activity"""
-    logs = load_json_file(VIEW_LOG_FILE)
-    
     log_entry = {
         "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
         "user_role": user_role,
@@ -147,15 +320,14 @@ def log_view(user_role, user_name, target, details):
         "details": details
     }
     
-    logs.append(log_entry)
+    if _use_db():
+        activity_db.log_view(log_entry)
+        return
     
-    # Keep only last 2000 entries (views happen more often)
-    if len(logs) > 2000:
-        logs = logs[-2000:]
-        
-    save_json_file(VIEW_LOG_FILE, logs)
+    event_log.append(_log_file(VIEW_LOG_FILE), [log_entry])
 
 def get_view_logs(limit=100):
     """Get recent view logs"""
-    logs = load_json_file(VIEW_LOG_FILE)
-    return logs[-limit:] if logs else []
+    if _use_db():
+        return activity_db.get_view_logs(limit)
+    return event_log.tail(_log_file(VIEW_LOG_FILE), limit)
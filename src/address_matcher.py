@@ -0,0 +1,382 @@
+import os
+import re
+import pickle
+import hashlib
+from pathlib import Path
+from typing import Optional, Tuple, List, Dict
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+# 시도 spellings seen in LocalData / district files -> short form used by the district Excel
+SIDO_ALIASES = {
+    '서울특별시': '서울', '서울시': '서울',
+    '부산광역시': '부산', '부산시': '부산',
+    '대구광역시': '대구', '대구시': '대구',
+    '인천광역시': '인천', '인천시': '인천',
+    '광주광역시': '광주',
+    '대전광역시': '대전', '대전시': '대전',
+    '울산광역시': '울산', '울산시': '울산',
+    '세종특별자치시': '세종', '세종시': '세종',
+    '경기도': '경기',
+    '강원특별자치도': '강원', '강원도': '강원',
+    '충청북도': '충북', '충청남도': '충남',
+    '전북특별자치도': '전북', '전라북도': '전북', '전라남도': '전남',
+    '경상북도': '경북', '경상남도': '경남',
+    '제주특별자치도': '제주', '제주도': '제주',
+}
+
+# Matching stages, in the order they run
+STAGES = ['exact', 'token', 'cosine']
+
+# Why an address stayed unmatched; with STAGES these are the per-address outcomes
+UNMATCHED_OUTCOMES = ['no_block', 'dong_mismatch', 'below_threshold']
+
+# Outcomes whose score is a real one (1.0 for lookups, cosine otherwise); 'no_block' targets are never scored
+SCORED_OUTCOMES = STAGES + ['dong_mismatch', 'below_threshold']
+
+# Part of the match memo key: bump whenever a change to the matcher changes its results
+MATCHER_VERSION = 2
+
+# Sparse scoring defaults: max query rows per product, and memory cap for one product
+DEFAULT_CHUNK_SIZE = 1000
+DEFAULT_MEMORY_BUDGET_MB = 256
+
+# Fitted vectorizers are persisted here, keyed by a hash of the district corpus
+BASE_DIR = Path(os.path.abspath(__file__)).parent.parent
+MATCHER_DIR = BASE_DIR / "storage" / "matcher"
+
+# Part of the cache key: changing the analyzer must invalidate stored vectorizers
+VECTORIZER_PARAMS = {'analyzer': 'char', 'ngram_range': (2, 3)}
+
+# In-process cache: corpus key -> (vectorizer, district_matrix)
+_vectorizer_cache = {}
+
+# Worst-case bytes per stored product entry (float64 data + int32 index, x2 for scipy intermediates)
+_BYTES_PER_ENTRY = 24
+
+
+def corpus_key(district_norms: List[str]) -> str:
+    """Hash of the normalized district corpus and vectorizer settings."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr(sorted(VECTORIZER_PARAMS.items())).encode())
+    for norm in district_norms:
+        h.update(norm.encode('utf-8'))
+        h.update(b'\n')
+    return h.hexdigest()
+
+
+def get_district_vectorizer(district_norms: List[str]):
+    """
+    TF-IDF vectorizer fitted on the district addresses plus the transformed district matrix.
+    The district Excel changes about monthly, so the fit is cached in process and on disk
+    (storage/matcher); a changed file changes the corpus key and triggers a refit.
+    """
+    key = corpus_key(district_norms)
+    if key in _vectorizer_cache:
+        return _vectorizer_cache[key]
+
+    vec_path = MATCHER_DIR / f"{key}.vectorizer.pkl"
+    mat_path = MATCHER_DIR / f"{key}.matrix.npz"
+    fitted = None
+    if vec_path.exists() and mat_path.exists():
+        try:
+            with open(vec_path, 'rb') as f:
+                fitted = pickle.load(f), sp.load_npz(mat_path)
+        except Exception as e:
+            print(f"Vectorizer cache load error: {e}")
+
+    if fitted is None:
+        vectorizer = TfidfVectorizer(**VECTORIZER_PARAMS).fit(district_norms)
+        fitted = vectorizer, vectorizer.transform(district_norms).tocsr()
+        try:
+            MATCHER_DIR.mkdir(parents=True, exist_ok=True)
+            tmp_vec = vec_path.with_name(f"{vec_path.name}.{os.getpid()}.tmp")
+            with open(tmp_vec, 'wb') as f:
+                pickle.dump(vectorizer, f)
+            tmp_mat = mat_path.with_name(f"{mat_path.stem}.{os.getpid()}.tmp.npz")
+            sp.save_npz(tmp_mat, fitted[1])
+            os.replace(tmp_mat, mat_path)
+            os.replace(tmp_vec, vec_path)
+            _prune_vectorizers()
+        except Exception as e:
+            print(f"Vectorizer cache save error: {e}")
+
+    _vectorizer_cache.clear()  # one district version at a time
+    _vectorizer_cache[key] = fitted
+    return fitted
+
+
+def _prune_vectorizers(keep: int = 3) -> None:
+    """Delete all but the `keep` most recent persisted vectorizers."""
+    stored = sorted(MATCHER_DIR.glob("*.vectorizer.pkl"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for vec_path in stored[keep:]:
+        key = vec_path.name.split('.')[0]
+        for path in (vec_path, MATCHER_DIR / f"{key}.matrix.npz"):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+
+def _token_key(tokens: List[str], n_sigungu: int) -> Optional[Tuple[str, str, str]]:
+    """(시도, 시군구, 동) key; 시군구 may span two tokens (e.g. '고양시 덕양구')."""
+    if len(tokens) < n_sigungu + 2:
+        return None
+    sido = SIDO_ALIASES.get(tokens[0], tokens[0])
+    return sido, ' '.join(tokens[1:1 + n_sigungu]), tokens[1 + n_sigungu]
+
+
+def _block_key(tokens: List[str]) -> Optional[Tuple[str, str]]:
+    """(시도, first 시군구 token) block used to restrict cosine candidates."""
+    if len(tokens) < 2:
+        return None
+    return SIDO_ALIASES.get(tokens[0], tokens[0]), tokens[1]
+
+
+# Leading 동/가 part of an address token, e.g. '아현2동' in '아현2동329-12(3층)'
+_DONG_PREFIX = re.compile(r'\D+?[\d.·]*[동가]')
+
+
+def _dong_key(token: str) -> str:
+    """동/가 token with the administrative 동 number dropped ('태장2동' -> '태장동'); '중앙로2가' is kept."""
+    return re.sub(r'[\d.·]+동$', '동', token)
+
+
+def _target_dongs(addr: str) -> set:
+    """동/가 keys found after the 시도 and first 시군구 token of a target address."""
+    keys = set()
+    for token in addr.split()[2:]:
+        m = _DONG_PREFIX.match(token)
+        if m:
+            keys.add(_dong_key(m.group(0)))
+    return keys
+
+
+def build_district_index(district_norms: List[str], district_originals: List[str]) -> Dict[str, Dict]:
+    """
+    Lookup tables for the cheap stages: normalized string -> district address,
+    and (시도, 시군구, 동) -> district address. First occurrence wins, like drop_duplicates.
+    Also groups district row positions by (시도, 시군구) block and keeps each row's
+    동/가 key (see _dong_key) for the cosine stage.
+    """
+    exact = {}
+    token = {}
+    blocks = {}
+    dongs = []
+    for pos, (norm, original) in enumerate(zip(district_norms, district_originals)):
+        exact.setdefault(norm, original)
+        tokens = norm.split()
+        if len(tokens) >= 3:
+            token.setdefault(_token_key(tokens, len(tokens) - 2), original)
+        # 읍/면 rows are not checked: LocalData often names a 면 the district file folds into the 읍
+        dongs.append(_dong_key(tokens[-1]) if len(tokens) >= 3 and tokens[-1][-1] in '동가' else None)
+        block = _block_key(tokens)
+        if block is not None:
+            blocks.setdefault(block, []).append(pos)
+    blocks = {k: np.array(v) for k, v in blocks.items()}
+    return {'exact': exact, 'token': token, 'blocks': blocks, 'dongs': dongs}
+
+
+def _lookup_token(index: Dict, addr: str) -> Optional[str]:
+    tokens = addr.split()
+    for n_sigungu in (1, 2):
+        key = _token_key(tokens, n_sigungu)
+        if key is not None and key in index['token']:
+            return index['token'][key]
+    return None
+
+
+def _rows_per_chunk(n_cols: int, chunk_size: int, memory_budget_mb: Optional[float]) -> int:
+    """Query rows per sparse product so that a fully dense result would still fit the budget."""
+    if not memory_budget_mb:
+        return max(1, chunk_size)
+    budget_rows = int(memory_budget_mb * 1024 * 1024 // (max(1, n_cols) * _BYTES_PER_ENTRY))
+    return max(1, min(chunk_size, budget_rows))
+
+
+def sparse_top1(query_matrix, corpus_matrix, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                memory_budget_mb: Optional[float] = DEFAULT_MEMORY_BUDGET_MB) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Best corpus row and score per query row for L2-normalized sparse matrices (TF-IDF output),
+    where cosine similarity is the plain dot product. Each chunk is a sparse x sparse product
+    reduced row-wise on its stored entries, so the dense chunk x corpus block is never built.
+    Rows with no overlap get index -1 and score 0. Ties resolve to the lowest corpus index.
+    """
+    n_rows = query_matrix.shape[0]
+    best_idx = np.full(n_rows, -1, dtype=np.int64)
+    best_score = np.zeros(n_rows, dtype=np.float64)
+    corpus_t = corpus_matrix.T.tocsc()
+    step = _rows_per_chunk(corpus_matrix.shape[0], chunk_size, memory_budget_mb)
+
+    for start in range(0, n_rows, step):
+        end = min(start + step, n_rows)
+        prod = (query_matrix[start:end] @ corpus_t).tocsr()
+        prod.sort_indices()
+        counts = np.diff(prod.indptr)
+        rows = np.flatnonzero(counts)
+        if rows.size == 0:
+            continue
+
+        row_max = np.maximum.reduceat(prod.data, prod.indptr[rows])
+        row_of_entry = np.repeat(np.arange(end - start), counts)
+        entry_max = np.zeros(end - start)
+        entry_max[rows] = row_max
+        # First stored entry equal to the row max (indices are sorted -> lowest column)
+        hits = np.flatnonzero(prod.data == entry_max[row_of_entry])
+        hit_rows, first = np.unique(row_of_entry[hits], return_index=True)
+
+        best_idx[start + hit_rows] = prod.indices[hits[first]]
+        best_score[start + hit_rows] = prod.data[hits[first]]
+
+    return best_idx, best_score
+
+
+def _match_cosine(target_addrs, district_index, vectorizer, district_matrix, district_originals, threshold,
+                  chunk_size, memory_budget_mb):
+    """
+    Char n-gram TF-IDF cosine, scored only against district rows in the target's (시도, 시군구) block.
+    Targets whose block has no district rows are left unmatched without scoring. The best
+    candidate is only accepted if its 동/가 also appears in the target: neighbouring 동 share
+    most n-grams ('성내동' / '성북동', '중앙로2가' / '중앙로3가') and score above the threshold.
+    Returns (matched_results, scores, outcomes); outcomes is 'cosine' or an UNMATCHED_OUTCOMES reason.
+    """
+    matched_results = [None] * len(target_addrs)
+    scores = [0.0] * len(target_addrs)
+    outcomes = ['no_block'] * len(target_addrs)
+
+    groups = {}
+    for i, addr in enumerate(target_addrs):
+        block = _block_key(addr.split())
+        if block in district_index['blocks']:
+            groups.setdefault(block, []).append(i)
+    if not groups:
+        return matched_results, scores, outcomes
+
+    scored_positions = [i for rows in groups.values() for i in rows]
+    target_matrix = vectorizer.transform([target_addrs[i] for i in scored_positions])
+    matrix_row = {i: r for r, i in enumerate(scored_positions)}
+
+    for block, rows in groups.items():
+        candidates = district_index['blocks'][block]
+        block_targets = target_matrix[[matrix_row[i] for i in rows]]
+        best_idx, best_score = sparse_top1(block_targets, district_matrix[candidates], chunk_size, memory_budget_mb)
+
+        for j, score in enumerate(best_score):
+            scores[rows[j]] = float(score)
+            if score < threshold:
+                outcomes[rows[j]] = 'below_threshold'
+                continue
+            best = candidates[best_idx[j]]
+            dong = district_index['dongs'][best]
+            if dong is not None and dong not in _target_dongs(target_addrs[rows[j]]):
+                outcomes[rows[j]] = 'dong_mismatch'
+                continue
+            matched_results[rows[j]] = district_originals[best]
+            outcomes[rows[j]] = 'cosine'
+
+    return matched_results, scores, outcomes
+
+
+def match_addresses(target_addrs: List[str], district_index: Dict, vectorizer, district_matrix, district_originals: List[str],
+                    threshold: float = 0.5, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                    memory_budget_mb: Optional[float] = DEFAULT_MEMORY_BUDGET_MB) -> Tuple[List[Optional[str]], List[float], List[str], Dict[str, int]]:
+    """
+    Staged matcher. Each stage only sees what the previous one left unresolved:
+      1. exact   - dict lookup on the normalized address
+      2. token   - (시도, 시군구, 동) lookup on the leading tokens
+      3. cosine  - TF-IDF cosine scoring for the rest, blocked by (시도, 시군구)
+    chunk_size / memory_budget_mb bound the sparse products of the cosine stage (see sparse_top1).
+    Returns the matched district address per target (None if unmatched), its score
+    (1.0 for lookup hits, best cosine otherwise), its outcome (the stage that resolved it,
+    or 'no_block' (no district rows in the target's (시도, 시군구) block), 'dong_mismatch'
+    (best candidate is another 동/가) or 'below_threshold' (scored, best < threshold))
+    and the number of targets per outcome, plus the 'unmatched' total.
+    """
+    results: List[Optional[str]] = [None] * len(target_addrs)
+    scores: List[float] = [0.0] * len(target_addrs)
+    outcomes: List[str] = [''] * len(target_addrs)
+
+    pending = []
+    for i, addr in enumerate(target_addrs):
+        hit = district_index['exact'].get(addr)
+        if hit is not None:
+            results[i], scores[i], outcomes[i] = hit, 1.0, 'exact'
+            continue
+        hit = _lookup_token(district_index, addr)
+        if hit is not None:
+            results[i], scores[i], outcomes[i] = hit, 1.0, 'token'
+            continue
+        pending.append(i)
+
+    if pending:
+        scored = _match_cosine([target_addrs[i] for i in pending], district_index, vectorizer, district_matrix,
+                               district_originals, threshold, chunk_size, memory_budget_mb)
+        for i, candidate, score, outcome in zip(pending, *scored):
+            results[i], scores[i], outcomes[i] = candidate, score, outcome
+
+    stats = {stage: outcomes.count(stage) for stage in STAGES}
+    stats['unmatched'] = len(target_addrs) - sum(stats.values())
+    stats.update({reason: outcomes.count(reason) for reason in UNMATCHED_OUTCOMES})
+    return results, scores, outcomes, stats
+
+
+def score_histogram(scores, bins: int = 10) -> Dict[str, int]:
+    """Counts of match scores in equal-width bins over [0, 1], keyed '0.0-0.1', ..."""
+    counts, edges = np.histogram(np.asarray(scores, dtype=np.float64), bins=bins, range=(0.0, 1.0))
+    return {f"{edges[i]:.1f}-{edges[i + 1]:.1f}": int(c) for i, c in enumerate(counts)}
+
+
+# --- Match Memo (address -> match, persisted across loads) ---
+
+MEMO_FILE_NAME = "address_memo.parquet"
+
+
+def memo_version(district_version: str, threshold: float) -> str:
+    """Memo key: the district corpus hash plus the matching threshold and MATCHER_VERSION."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{district_version}|{threshold!r}|{MATCHER_VERSION}".encode())
+    return h.hexdigest()
+
+
+def load_match_memo(memo_version: str) -> Dict[str, Tuple[Optional[str], float, str]]:
+    """
+    Previously matched addresses for this memo version (see memo_version):
+    소재지전체주소_norm -> (matched_address, score, outcome). Entries recorded under
+    another district corpus, threshold or matcher version are ignored.
+    """
+    memo_file = MATCHER_DIR / MEMO_FILE_NAME
+    if not memo_file.exists():
+        return {}
+    try:
+        memo_df = pd.read_parquet(memo_file)
+    except Exception as e:
+        print(f"Match memo load error: {e}")
+        return {}
+    if not {'memo_version', 'outcome'} <= set(memo_df.columns):
+        return {}
+    memo_df = memo_df[memo_df['memo_version'] == memo_version]
+    matched = memo_df['matched_address'].astype(object).where(memo_df['matched_address'].notna(), None)
+    return dict(zip(memo_df['address_norm'], zip(matched, memo_df['score'].astype(float), memo_df['outcome'].astype(str))))
+
+
+def save_match_memo(memo_version: str, memo: Dict[str, Tuple[Optional[str], float, str]]) -> bool:
+    """Rewrite the memo with this memo version's entries only (older versions are dropped)."""
+    memo_df = pd.DataFrame({
+        'address_norm': list(memo.keys()),
+        'matched_address': [m for m, _, _ in memo.values()],
+        'score': np.array([score for _, score, _ in memo.values()], dtype=np.float32),
+        'outcome': [outcome for _, _, outcome in memo.values()],
+        'memo_version': memo_version,
+    })
+    try:
+        MATCHER_DIR.mkdir(parents=True, exist_ok=True)
+        memo_file = MATCHER_DIR / MEMO_FILE_NAME
+        tmp_path = memo_file.with_name(f"{memo_file.name}.{os.getpid()}.tmp")
+        memo_df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, memo_file)
+    except Exception as e:
+        print(f"Match memo save error: {e}")
+        return False
+    return True
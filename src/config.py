@@ -17,3 +17,28 @@ CUSTOM_BRANCH_ORDER = ['중앙지사', '강북지사', '서대문지사', '고
 
 # Role Mapping
 ROLE_MAP = {'admin': '👮 관리자', 'branch': '🏢 지사 관리자', 'manager': '👤 담당자'}
+
+# Ingest: worker processes for per-file CSV parsing in load_and_process_data (1 = serial)
+INGEST_MAX_WORKERS = int(os.environ.get('INGEST_MAX_WORKERS', '1'))
+
+# Ingest: reuse on-disk Parquet snapshots of the processed data (set to 0 to always rebuild)
+SNAPSHOT_CACHE_ENABLED = os.environ.get('SNAPSHOT_CACHE_ENABLED', '1') != '0'
+
+# Matching: sparse cosine chunking (query rows per product, memory cap per product in MB)
+MATCH_CHUNK_SIZE = int(os.environ.get('MATCH_CHUNK_SIZE', '1000'))
+MATCH_MEMORY_BUDGET_MB = float(os.environ.get('MATCH_MEMORY_BUDGET_MB', '256'))
+
+# Activity status / history / logs storage: 'sqlite' (storage/activity.db, WAL) or 'json' (legacy files)
+ACTIVITY_BACKEND = os.environ.get('ACTIVITY_BACKEND', 'sqlite')
+
+# Log retention: rows kept per SQLite log table
+ACCESS_LOG_KEEP = int(os.environ.get('ACCESS_LOG_KEEP', '1000'))
+VIEW_LOG_KEEP = int(os.environ.get('VIEW_LOG_KEEP', '2000'))
+CHANGE_HISTORY_KEEP = int(os.environ.get('CHANGE_HISTORY_KEEP', '5000'))
+
+# JSONL logs (json backend): rotate by 'size' (LOG_ROTATE_BYTES) or 'day', gzip rotated
+# segments, delete segments older than LOG_RETENTION_DAYS
+LOG_ROTATION = os.environ.get('LOG_ROTATION', 'size')
+LOG_ROTATE_BYTES = int(os.environ.get('LOG_ROTATE_BYTES', str(5 * 1024 * 1024)))
+LOG_GZIP = os.environ.get('LOG_GZIP', '1') != '0'
+LOG_RETENTION_DAYS = int(os.environ.get('LOG_RETENTION_DAYS', '90'))
@@ -2,28 +2,176 @@
 import pandas as pd
 import os
 import zipfile
+import csv
+import io
 import glob
 import streamlit as st
 import requests
 import xml.etree.ElementTree as ET
 import unicodedata
-import shutil
+import time
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 from typing import Optional, Tuple, List, Dict, Any, Union
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 
 # Import from local utils
-from src.utils import normalize_address, parse_coordinates_row, get_best_match, calculate_area, transformer, HAS_PYPROJ
+from src.utils import normalize_address_series, MIN_ADDRESS_LENGTH, parse_coordinates_row, get_best_match, calculate_area, transformer, HAS_PYPROJ
+from src.config import INGEST_MAX_WORKERS, SNAPSHOT_CACHE_ENABLED, MATCH_CHUNK_SIZE, MATCH_MEMORY_BUDGET_MB
+from src import snapshot_cache
+from src import address_matcher
+from src import filter_index
+from src import search_index
 
 def normalize_str(s: Any) -> Optional[str]:
     if pd.isna(s): return s
     return unicodedata.normalize('NFC', str(s)).strip()
 
-def _process_and_merge_district_data(target_df: pd.DataFrame, district_file_path_or_obj: Any) -> Tuple[pd.DataFrame, List[Dict], Optional[str]]:
+# Columns kept from each LocalData CSV (matched by substring, renamed to the pattern)
+DESIRED_PATTERNS = ['소재지전체주소', '도로명전체주소', '사업장명', '업태구분명', '영업상태명', 
+                    '소재지전화', '총면적', '소재지면적', '인허가일자', '폐업일자', 
+                    '재개업일자', '최종수정시점', '데이터기준일자',
+                    '개방자치단체코드', '관리번호']
+
+# Record key for delta (변동분) ingestion: LocalData rows are unique per 개방자치단체코드 + 관리번호
+RECORD_KEY_COLS = ['개방자치단체코드', '관리번호']
+
+# Extra columns read from delta CSVs (I: insert, U: update, D: delete)
+DELTA_PATTERNS = ['데이터갱신구분', '데이터갱신일자']
+
+# Region filter applied to each file's address column
+REGION_PATTERN = '서울|경기|강원'
+
+# Minimum cosine score for a district match
+MATCH_THRESHOLD = 0.5
+
+# Dtype layout of the final DataFrame (see _compact_dtypes)
+CATEGORY_COLUMNS = ['관리지사', 'SP담당', '영업상태명', '업태구분명', '영업구역 수정', '개방서비스명']
+FLOAT32_COLUMNS = ['lat', 'lon', '평수', '소재지면적', '총면적']
+DATETIME_COLUMNS = ['인허가일자', '폐업일자', '재개업일자', '휴업시작일자', '휴업종료일자', '최종수정시점', '데이터기준일자']
+
+# Text columns NFC-normalized once at ingest (Mac/Windows uploads differ)
+NFC_COLUMNS = ['관리지사', 'SP담당', '사업장명', '소재지전체주소', '영업상태명', '업태구분명']
+
+# attrs flag marking NFC_COLUMNS as already normalized, so the index builders can skip it (see nfc_columns)
+NFC_FLAG = 'nfc_normalized'
+
+def _read_csv_header(fh: Any) -> List[str]:
+    """
+    Reads only the first line of a cp949 CSV byte stream and splits it into column names.
+    """
+    first_line = fh.readline().decode('cp949', errors='replace').rstrip('\r\n')
+    return next(csv.reader([first_line]), [])
+
+def _resolve_usecols(columns: List[str], extra_patterns: Tuple[str, ...] = ()) -> Optional[List[int]]:
+    """
+    Picks the column positions the pipeline needs: address, coordinate and DESIRED_PATTERNS columns.
+    Returns None when the file has no address column and should be skipped.
+    """
+    if not any('주소' in c for c in columns):
+        return None
+    patterns = DESIRED_PATTERNS + list(extra_patterns)
+    return [i for i, c in enumerate(columns)
+            if '주소' in c or '좌표' in c or any(pat in c for pat in patterns)]
+
+def _parse_csv_stream(fh: Any, extra_patterns: Tuple[str, ...] = (), region_filter: bool = True) -> Optional[pd.DataFrame]:
+    """
+    Parses one LocalData CSV stream: needed columns only, rows in the target regions only.
+    """
+    usecols = _resolve_usecols(_read_csv_header(fh), extra_patterns)
+    if usecols is None:
+        return None
+    
+    fh.seek(0)
+    df = pd.read_csv(fh, encoding='cp949', on_bad_lines='skip', dtype=str, usecols=usecols, low_memory=False)
+    if not region_filter:
+        return df
+    address_col = [c for c in df.columns if '주소' in c][0]
+    
+    # Filter standard headers
+    return df[df[address_col].str.contains(REGION_PATTERN, na=False)]
+
+# --- Process Pool Workers (parallel ingestion) ---
+_worker_zip = None
+
+def _zip_source_for_workers(zip_file_path_or_obj: Any) -> Union[str, bytes]:
+    """Paths are reopened by each worker; uploaded file objects are shipped once as bytes."""
+    if isinstance(zip_file_path_or_obj, (str, os.PathLike)):
+        return os.fspath(zip_file_path_or_obj)
+    if hasattr(zip_file_path_or_obj, 'getvalue'):
+        return zip_file_path_or_obj.getvalue()
+    zip_file_path_or_obj.seek(0)
+    return zip_file_path_or_obj.read()
+
+def _init_zip_worker(zip_source: Union[str, bytes]) -> None:
+    global _worker_zip
+    if isinstance(zip_source, bytes):
+        zip_source = io.BytesIO(zip_source)
+    _worker_zip = zipfile.ZipFile(zip_source, 'r')
+
+def _parse_zip_member(member_name: str) -> Optional[pd.DataFrame]:
+    try:
+        with _worker_zip.open(member_name) as fh:
+            return _parse_csv_stream(fh)
+    except Exception:
+        return None
+
+def _compact_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Shrinks the final DataFrame in place: low-cardinality text to category,
+    coordinates and areas to float32, date columns to datetime64. Also derives
+    the int32 year-month key columns (filter_index.YM_COLUMNS) from the dates.
+    """
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    for col in FLOAT32_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype('float32')
+    for col in DATETIME_COLUMNS:
+        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+    for col, key_col in filter_index.YM_COLUMNS.items():
+        if col in df.columns:
+            df[key_col] = filter_index.ym_key(df[col])
+    return df
+
+def _match_outcomes(df: pd.DataFrame, match_memo: Dict[str, Tuple[Optional[str], float, str]]) -> Dict:
+    """
+    Match report counts over every row of a processed frame: matched / unmatched rows,
+    rows per outcome (looked up per address in the match memo) and the score histogram
+    of its distinct scored addresses (SCORED_OUTCOMES; 'no_block' ones have no score).
+    Addresses without a memo entry (matches reused from a base frame built under
+    another memo version) count as 'reused'.
+    """
+    outcomes = dict.fromkeys(address_matcher.STAGES + address_matcher.UNMATCHED_OUTCOMES, 0)
+    scores = []
+    row_counts = df['소재지전체주소_norm'].value_counts()
+    for addr, n in row_counts[row_counts > 0].items():
+        entry = match_memo.get(addr)
+        if entry is None:
+            outcomes['reused'] = outcomes.get('reused', 0) + int(n)
+            continue
+        outcomes[entry[2]] += int(n)
+        if entry[2] in address_matcher.SCORED_OUTCOMES:
+            scores.append(entry[1])
+    matched_rows = int(df['matched_address'].notna().sum())
+    return {
+        'matched_rows': matched_rows,
+        'unmatched_rows': len(df) - matched_rows,
+        'outcomes': outcomes,
+        'score_histogram': address_matcher.score_histogram(scores),
+    }
+
+def _process_and_merge_district_data(target_df: pd.DataFrame, district_file_path_or_obj: Any, known_matches: Optional[Dict[str, Optional[str]]] = None) -> Tuple[pd.DataFrame, List[Dict], Optional[str]]:
     """
     Common logic to process district file, match addresses, and merge with target_df.
+    known_matches maps 소재지전체주소_norm -> matched district address (or None) for
+    addresses already matched against the same district file; those rows skip scoring.
+    final_df.attrs['match_report'] holds outcome counts, a score histogram and stage timings.
     """
+    timings = {}
+    t0 = time.perf_counter()
+    n_input = len(target_df)
     # 1. Load District File
     try:
         df_district = pd.read_excel(district_file_path_or_obj)
@@ -40,7 +188,7 @@ def _process_and_merge_district_data(target_df: pd.DataFrame, district_file_path
     df_district['관리지사'] = df_district['관리지사'].apply(normalize_str)
     df_district['SP담당'] = df_district['SP담당'].apply(normalize_str)
     
-    df_district['full_address_norm'] = df_district['full_address'].apply(normalize_address)
+    df_district['full_address_norm'] = normalize_address_series(df_district['full_address'], MIN_ADDRESS_LENGTH)
     df_district = df_district.dropna(subset=['full_address_norm'])
     
     # Deduplicate District Data
@@ -52,60 +200,48 @@ def _process_and_merge_district_data(target_df: pd.DataFrame, district_file_path
         # If API data lacked it or named differently, ensure mapped before calling this
         pass
 
-    target_df['소재지전체주소_norm'] = target_df['소재지전체주소'].astype(str).apply(normalize_address)
+    target_df['소재지전체주소_norm'] = normalize_address_series(target_df['소재지전체주소'].astype(str), MIN_ADDRESS_LENGTH)
     # Don't dropNA on target immediately, or we lose rows? 
     # Logic in previous code: target_df = target_df.dropna(subset=['소재지전체주소_norm'])
     # Yes, we can drop because we can't match without address
     target_df = target_df.dropna(subset=['소재지전체주소_norm'])
+    timings['normalize'] = time.perf_counter() - t0
 
     # 4. Batch Matching Logic
+    t0 = time.perf_counter()
     # Prepare Corpus (District)
-    vectorizer = TfidfVectorizer(analyzer='char', ngram_range=(2, 3)).fit(df_district['full_address_norm'])
-    district_matrix = vectorizer.transform(df_district['full_address_norm'])
+    district_norms = df_district['full_address_norm'].tolist()
+    # Fitted once per district version (persisted in storage/matcher), not per call
+    vectorizer, district_matrix = address_matcher.get_district_vectorizer(district_norms)
     district_originals = df_district['full_address'].tolist()
+    district_index = address_matcher.build_district_index(district_norms, district_originals)
+    timings['vectorize'] = time.perf_counter() - t0
     
-    # Prepare Query (Target)
-    target_addrs = target_df['소재지전체주소_norm'].tolist()
+    t0 = time.perf_counter()
+    # Addresses matched in earlier loads with the same district version, threshold and matcher skip scoring
+    memo_version = address_matcher.memo_version(address_matcher.corpus_key(district_norms), MATCH_THRESHOLD)
+    match_memo = address_matcher.load_match_memo(memo_version)
+    known_matches = {**{addr: m for addr, (m, _, _) in match_memo.items()}, **(known_matches or {})}
     
-    matched_results = []
+    # Prepare Query (Target) - only addresses without a known match are scored
+    pending_mask = ~target_df['소재지전체주소_norm'].isin(list(known_matches))
+    target_addrs = target_df.loc[pending_mask, '소재지전체주소_norm'].drop_duplicates().tolist()
+    
+    matched_results, match_scores, match_outcomes, stage_counts = address_matcher.match_addresses(
+        target_addrs, district_index, vectorizer, district_matrix, district_originals, threshold=MATCH_THRESHOLD,
+        chunk_size=MATCH_CHUNK_SIZE, memory_budget_mb=MATCH_MEMORY_BUDGET_MB
+    )
+    print(f"District matching: {len(target_df) - int(pending_mask.sum())} memoized, {len(target_addrs)} scored, {stage_counts}")
     
     if target_addrs:
-        target_matrix = vectorizer.transform(target_addrs)
-        
-        # Chunked Processing
-        chunk_size = 1000
-        num_rows = target_matrix.shape[0]
-        THRESHOLD = 0.5
-        
-        def extract_geo_tokens(addr):
-            if not addr: return set()
-            tokens = addr.split()
-            return set(tokens[:2]) if len(tokens) >= 2 else set(tokens)
-
-        for i in range(0, num_rows, chunk_size):
-            end = min(i + chunk_size, num_rows)
-            chunk_target = target_matrix[i:end]
-            chunk_sim = cosine_similarity(chunk_target, district_matrix)
-            
-            chunk_best_indices = chunk_sim.argmax(axis=1)
-            chunk_best_scores = chunk_sim.max(axis=1)
-            
-            for j, score in enumerate(chunk_best_scores):
-                if score >= THRESHOLD:
-                    candidate = district_originals[chunk_best_indices[j]]
-                    query = target_addrs[i + j]
-                    
-                    q_tok = extract_geo_tokens(query)
-                    c_tok = extract_geo_tokens(candidate)
-                    
-                    if q_tok.intersection(c_tok):
-                        matched_results.append(candidate)
-                    else:
-                        matched_results.append(None)
-                else:
-                    matched_results.append(None)
-    
-    target_df['matched_address'] = matched_results
+        match_memo.update(zip(target_addrs, zip(matched_results, match_scores, match_outcomes)))
+        address_matcher.save_match_memo(memo_version, match_memo)
+    
+    timings['score'] = time.perf_counter() - t0
+    
+    t0 = time.perf_counter()
+    known_matches.update(zip(target_addrs, matched_results))
+    target_df['matched_address'] = target_df['소재지전체주소_norm'].map(known_matches).astype(object)
     
     # 5. Merge
     merge_cols = ['full_address', '관리지사', 'SP담당']
@@ -123,6 +259,7 @@ def _process_and_merge_district_data(target_df: pd.DataFrame, district_file_path
     # 7. Final Cleanup
     # [FIX] Do not drop unassigned branches (`관리지사` is null or `미지정`). Keep them for Admin review.
     final_df['관리지사'] = final_df['관리지사'].fillna('미지정')
+    final_df.loc[final_df['관리지사'].str.strip() == '', '관리지사'] = '미지정'
     # final_df = final_df.dropna(subset=['관리지사']) # Removed to keep unassigned
     # final_df = final_df[final_df['관리지사'] != '미지정'] # Removed to keep unassigned
     
@@ -135,65 +272,50 @@ def _process_and_merge_district_data(target_df: pd.DataFrame, district_file_path
         mgr_info = df_district[['SP담당', '영업구역 수정', '관리지사']].drop_duplicates().to_dict(orient='records')
     else:
         mgr_info = df_district[['SP담당', '관리지사']].drop_duplicates().to_dict(orient='records')
-        
-    return final_df, mgr_info, None
-
-@st.cache_data
-def load_and_process_data(zip_file_path_or_obj: Any, district_file_path_or_obj: Any, dist_mtime: Optional[float] = None) -> Tuple[Union[pd.DataFrame, None], List[Dict], Optional[str]]:
-    """
-    Loads data from uploads, extracts ZIP, processes CSVs, and merges with district data.
-    """
-    # 1. Process Zip File
-    extract_folder = "temp_extracted_data"
     
-    if os.path.exists(extract_folder):
-        try: shutil.rmtree(extract_folder)
-        except: pass
-    os.makedirs(extract_folder, exist_ok=True)
+    # Global NFC normalization (previously redone by app.py on every rerun)
+    for col in NFC_COLUMNS:
+        if col in final_df.columns:
+            final_df[col] = final_df[col].astype(str).str.normalize('NFC').str.strip()
+    final_df.attrs[NFC_FLAG] = True
     
-    try:
-        with zipfile.ZipFile(zip_file_path_or_obj, 'r') as zip_ref:
-            zip_ref.extractall(extract_folder)
-    except Exception as e:
-        return None, [], f"ZIP extraction failed: {e}"
-        
-    all_files = glob.glob(os.path.join(extract_folder, "**/*.csv"), recursive=True)
-    dfs = []
+    # 최종수정시점: latest of 인허가일자/폐업일자 per row. Rows with neither stay NaT
+    # (snapshots outlive the load); the date filter reads NaT as today.
+    date_cols = [c for c in ['인허가일자', '폐업일자'] if c in final_df.columns]
+    if date_cols:
+        final_df['최종수정시점'] = final_df[date_cols].max(axis=1)
+    else:
+        final_df['최종수정시점'] = pd.NaT
     
-    for file in all_files:
-        try:
-            # Check header
-            df_iter = pd.read_csv(file, encoding='cp949', on_bad_lines='skip', dtype=str, chunksize=1000)
-            header = next(df_iter)
-            if not any('주소' in c for c in header.columns): continue
-                
-            df = pd.read_csv(file, encoding='cp949', on_bad_lines='skip', dtype=str, low_memory=False)
-            address_col = [c for c in df.columns if '주소' in c][0]
-            
-            # Filter standard headers
-            df_filtered = df[df[address_col].str.contains('서울|경기|강원', na=False)]
-            dfs.append(df_filtered)
-        except Exception:
-            continue
-            
-    if not dfs:
-        return None, [], "No valid CSV files found in ZIP."
+    _compact_dtypes(final_df)
+    timings['merge'] = time.perf_counter() - t0
+    
+    # Match report (kept in attrs so it survives st.cache_data and snapshots)
+    final_df.attrs['match_report'] = {
+        'rows': n_input,
+        'no_address': n_input - len(target_df),
+        **_match_outcomes(final_df, match_memo),
+        'memoized_rows': len(target_df) - int(pending_mask.sum()),
+        'scored_addresses': len(target_addrs),
+        'threshold': MATCH_THRESHOLD,
+        'memo_version': memo_version,
+        'timings': {k: round(v, 3) for k, v in timings.items()},
+    }
         
-    concatenated_df = pd.concat(dfs, ignore_index=True)
-    concatenated_df.drop_duplicates(subset=['사업장명', '소재지전체주소'], inplace=True)
+    return final_df, mgr_info, None
 
+def _build_target_df(concatenated_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Maps raw LocalData columns to DESIRED_PATTERNS names, parses dates and converts coordinates to lat/lon.
+    """
     # Dynamic Column Mapping
     all_cols = concatenated_df.columns
     x_col = next((c for c in all_cols if '좌표' in c and ('x' in c.lower() or 'X' in c)), None)
     y_col = next((c for c in all_cols if '좌표' in c and ('y' in c.lower() or 'Y' in c)), None)
     
-    desired_patterns = ['소재지전체주소', '도로명전체주소', '사업장명', '업태구분명', '영업상태명', 
-                        '소재지전화', '총면적', '소재지면적', '인허가일자', '폐업일자', 
-                        '재개업일자', '최종수정시점', '데이터기준일자']
-    
     rename_map = {}
     selected_cols = []
-    for pat in desired_patterns:
+    for pat in DESIRED_PATTERNS:
         match = next((c for c in all_cols if pat in c), None)
         if match:
             selected_cols.append(match)
@@ -248,9 +370,217 @@ def load_and_process_data(zip_file_path_or_obj: Any, district_file_path_or_obj:
         target_df['lat'] = None
         target_df['lon'] = None
         
+    return target_df
+
+def load_and_process_data(zip_file_path_or_obj: Any, district_file_path_or_obj: Any, dist_mtime: Optional[float] = None, max_workers: Optional[int] = None) -> Tuple[Union[pd.DataFrame, None], List[Dict], Optional[str]]:
+    """
+    Loads data from uploads, streams CSVs out of the ZIP, and merges with district data.
+    Members are read in place via ZipFile.open, so nothing is written to the working
+    directory and concurrent sessions cannot clobber each other.
+    max_workers > 1 parses members in a process pool (defaults to INGEST_MAX_WORKERS).
+    Results are also persisted as a Parquet snapshot (src.snapshot_cache), so a restart
+    with unchanged inputs skips parsing and matching entirely.
+    The app reads it through load_shared_dataset, which keeps one in-memory copy.
+    """
+    # 0. Persistent Snapshot (survives restarts; keyed by input content hash)
+    snapshot_key = snapshot_cache.compute_snapshot_key(zip_file_path_or_obj, district_file_path_or_obj) if SNAPSHOT_CACHE_ENABLED else None
+    snapshot = snapshot_cache.load_snapshot(snapshot_key)
+    if snapshot is not None:
+        final_df, mgr_info = snapshot
+        return final_df, mgr_info, None
+    
+    # 1. Process Zip File
+    workers = max_workers if max_workers is not None else INGEST_MAX_WORKERS
+    
+    try:
+        with zipfile.ZipFile(zip_file_path_or_obj, 'r') as zip_ref:
+            csv_members = sorted(m.filename for m in zip_ref.infolist() if not m.is_dir() and m.filename.endswith('.csv'))
+            
+            if workers > 1 and len(csv_members) > 1:
+                # Parallel mode: each worker opens its own handle on the ZIP.
+                # pool.map yields in submission order, so the merge stays deterministic.
+                with ProcessPoolExecutor(max_workers=workers, initializer=_init_zip_worker,
+                                         initargs=(_zip_source_for_workers(zip_file_path_or_obj),)) as pool:
+                    results = list(pool.map(_parse_zip_member, csv_members))
+            else:
+                results = []
+                for member in csv_members:
+                    try:
+                        with zip_ref.open(member) as fh:
+                            results.append(_parse_csv_stream(fh))
+                    except Exception:
+                        continue
+    except Exception as e:
+        return None, [], f"ZIP read failed: {e}"
+    
+    dfs = [df for df in results if df is not None]
+            
+    if not dfs:
+        return None, [], "No valid CSV files found in ZIP."
+        
+    concatenated_df = pd.concat(dfs, ignore_index=True)
+    concatenated_df.drop_duplicates(subset=['사업장명', '소재지전체주소'], inplace=True)
+
+    target_df = _build_target_df(concatenated_df)
+        
     # Delegate to common processor
-    return _process_and_merge_district_data(target_df, district_file_path_or_obj)
+    final_df, mgr_info, error = _process_and_merge_district_data(target_df, district_file_path_or_obj)
+    if error is None:
+        snapshot_cache.save_snapshot(snapshot_key, final_df, mgr_info)
+    return final_df, mgr_info, error
+
+
+def _record_keys(df: pd.DataFrame) -> pd.Series:
+    return df[RECORD_KEY_COLS[0]].astype(str) + '|' + df[RECORD_KEY_COLS[1]].astype(str)
+
+def list_delta_files(delta_dir: str) -> List[str]:
+    """All 변동분 CSVs under delta_dir (e.g. 변동분/변동0115/*.csv), in path order."""
+    return sorted(glob.glob(os.path.join(delta_dir, "**", "*.csv"), recursive=True))
+
+def apply_delta_batch(base_df: pd.DataFrame, mgr_info: List[Dict], delta_files: List[str], district_file_path_or_obj: Any) -> Tuple[Union[pd.DataFrame, None], List[Dict], Optional[str]]:
+    """
+    Applies LocalData delta CSVs to an already processed DataFrame.
+    Rows are keyed on 개방자치단체코드 + 관리번호; the latest 데이터갱신일자 per key wins.
+    D deletes, I/U upserts (rows moved out of the target regions are deleted).
+    Only addresses not already present in base_df go through district matching.
+    """
+    if any(c not in base_df.columns for c in RECORD_KEY_COLS):
+        return None, [], "Base data has no 개방자치단체코드/관리번호 columns. Full rebuild required."
+    
+    frames = []
+    for path in delta_files:
+        try:
+            with open(path, 'rb') as fh:
+                df = _parse_csv_stream(fh, extra_patterns=tuple(DELTA_PATTERNS), region_filter=False)
+            if df is not None and all(c in df.columns for c in RECORD_KEY_COLS + DELTA_PATTERNS):
+                frames.append(df)
+        except Exception:
+            continue
+    
+    if not frames:
+        return base_df, mgr_info, None
+    
+    delta_df = pd.concat(frames, ignore_index=True)
+    delta_df = delta_df.sort_values('데이터갱신일자', kind='mergesort')
+    delta_df = delta_df.drop_duplicates(subset=RECORD_KEY_COLS, keep='last')
+    
+    # Every touched key leaves the base; upserts are re-added below
+    base_keys = _record_keys(base_df)
+    delta_keys = _record_keys(delta_df)
+    kept_df = base_df[~base_keys.isin(delta_keys)]
+    
+    address_col = next(c for c in delta_df.columns if '주소' in c)
+    upsert_mask = (delta_df['데이터갱신구분'] != 'D') & delta_df[address_col].str.contains(REGION_PATTERN, na=False)
+    upsert_df = delta_df[upsert_mask]
+    
+    n_deleted = int(base_keys.isin(delta_keys[~upsert_mask]).sum())
+    
+    if upsert_df.empty:
+        print(f"Delta batch: {len(delta_df)} rows, 0 inserted, 0 updated, {n_deleted} deleted")
+        return kept_df.reset_index(drop=True), mgr_info, None
+    
+    # Addresses already matched in the base reuse their result
+    known = base_df.dropna(subset=['소재지전체주소_norm']).drop_duplicates(subset=['소재지전체주소_norm'])
+    known_matches = dict(zip(known['소재지전체주소_norm'], known['matched_address']))
+    
+    target_df = _build_target_df(upsert_df)
+    merged_df, mgr_info_new, error = _process_and_merge_district_data(target_df, district_file_path_or_obj, known_matches=known_matches)
+    if error:
+        return None, [], error
+    
+    # Counted after merging, so upserts without a usable address are not reported as inserted
+    merged_in_base = _record_keys(merged_df).isin(base_keys)
+    n_updated = int(merged_in_base.sum())
+    n_inserted = len(merged_df) - n_updated
+    
+    # Same (사업장명, 소재지전체주소) dedup as a full load, base rows first so they win
+    combined = pd.concat([kept_df, merged_df], ignore_index=True)
+    n_combined = len(combined)
+    combined = combined.drop_duplicates(subset=['사업장명', '소재지전체주소'], keep='first')
+    print(f"Delta batch: {len(delta_df)} rows, {n_inserted} inserted, {n_updated} updated, {n_deleted} deleted, "
+          f"{n_combined - len(combined)} duplicates dropped")
+    
+    # Categories differ between the two parts, so concat falls back to object; compact again
+    final_df = _compact_dtypes(combined.reset_index(drop=True))
+    if '인허가일자' in final_df.columns:
+        final_df = final_df.sort_values(by='인허가일자', ascending=False, kind='mergesort').reset_index(drop=True)
+    final_df.attrs.update(merged_df.attrs)
+    report = merged_df.attrs.get('match_report')
+    if report:
+        # merged_df's report covers the upserted rows only; recount over the whole frame.
+        # Rows without an address are not kept (nor keyed), so their count stays the base load's:
+        # adding the batch's would count a row twice whenever the batch re-sends it.
+        no_address = base_df.attrs.get('match_report', {}).get('no_address', report['no_address'])
+        final_df.attrs['match_report'] = {
+            **report,
+            'rows': len(final_df) + no_address,
+            'no_address': no_address,
+            **_match_outcomes(final_df, address_matcher.load_match_memo(report['memo_version'])),
+        }
+    return final_df, mgr_info_new, None
+
+def load_and_apply_deltas(zip_file_path_or_obj: Any, district_file_path_or_obj: Any, delta_dir: str, dist_mtime: Optional[float] = None, delta_mtime: Optional[float] = None) -> Tuple[Union[pd.DataFrame, None], List[Dict], Optional[str]]:
+    """
+    Incremental mode: full ZIP load (snapshot-backed) plus every 변동분 batch under delta_dir.
+    The result is snapshotted under a key covering the delta files too.
+    dist_mtime / delta_mtime are only cache keys (see load_shared_dataset).
+    """
+    base_df, mgr_info, error = load_and_process_data(zip_file_path_or_obj, district_file_path_or_obj, dist_mtime=dist_mtime)
+    delta_files = list_delta_files(delta_dir)
+    if error or not delta_files:
+        return base_df, mgr_info, error
+    
+    snapshot_key = snapshot_cache.compute_snapshot_key(zip_file_path_or_obj, district_file_path_or_obj, *delta_files) if SNAPSHOT_CACHE_ENABLED else None
+    snapshot = snapshot_cache.load_snapshot(snapshot_key)
+    if snapshot is not None:
+        final_df, mgr_info = snapshot
+        return final_df, mgr_info, None
+    
+    final_df, mgr_info, error = apply_delta_batch(base_df, mgr_info, delta_files, district_file_path_or_obj)
+    if error is None:
+        snapshot_cache.save_snapshot(snapshot_key, final_df, mgr_info)
+    return final_df, mgr_info, error
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def load_shared_dataset(zip_file_path_or_obj: Any, district_file_path_or_obj: Any, delta_dir: Optional[str] = None, dist_mtime: Optional[float] = None, delta_mtime: Optional[float] = None) -> Tuple[Union[pd.DataFrame, None], List[Dict], Optional[str]]:
+    """
+    Master dataset shared by every session: st.cache_resource hands out the same object
+    instead of unpickling a private copy per session and rerun.
+    The frame is read-only by contract. Callers filter it or take copy(deep=False)
+    before adding columns, and never write into it in place.
+    delta_dir enables incremental mode (load_and_apply_deltas). The mtimes bust the cache
+    when local files change.
+    """
+    if delta_dir:
+        return load_and_apply_deltas(zip_file_path_or_obj, district_file_path_or_obj, delta_dir, dist_mtime=dist_mtime, delta_mtime=delta_mtime)
+    return load_and_process_data(zip_file_path_or_obj, district_file_path_or_obj, dist_mtime=dist_mtime)
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def load_shared_filter_index(zip_file_path_or_obj: Any, district_file_path_or_obj: Any, delta_dir: Optional[str] = None, dist_mtime: Optional[float] = None, delta_mtime: Optional[float] = None) -> Optional[Dict]:
+    """
+    Filter index (src.filter_index) over the shared dataset for the same arguments.
+    It is built once per dataset instead of once per rerun.
+    """
+    df, _, error = load_shared_dataset(zip_file_path_or_obj, district_file_path_or_obj, delta_dir, dist_mtime=dist_mtime, delta_mtime=delta_mtime)
+    if df is None:
+        return None
+    return filter_index.build_filter_index(df, type_col=filter_type_column(df), nfc_columns=nfc_columns(df))
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def load_shared_search_index(zip_file_path_or_obj: Any, district_file_path_or_obj: Any, delta_dir: Optional[str] = None, dist_mtime: Optional[float] = None, delta_mtime: Optional[float] = None) -> Optional[Dict]:
+    """Bigram search index (src.search_index) over the shared dataset, built once per dataset."""
+    df, _, error = load_shared_dataset(zip_file_path_or_obj, district_file_path_or_obj, delta_dir, dist_mtime=dist_mtime, delta_mtime=delta_mtime)
+    if df is None:
+        return None
+    return search_index.build_search_index(df, nfc_columns=nfc_columns(df))
+
+def nfc_columns(df: pd.DataFrame) -> List[str]:
+    """NFC_COLUMNS if df was NFC-normalized at ingest (attrs NFC_FLAG), else none."""
+    return NFC_COLUMNS if df.attrs.get(NFC_FLAG) else []
 
+def filter_type_column(df: pd.DataFrame) -> str:
+    """Business-type column used by the type/hospital filters."""
+    return '업태구분명' if '업태구분명' in df.columns else df.columns[0]
 
 def fetch_openapi_data(auth_key: str, local_code: str, start_date: str, end_date: str) -> Tuple[Optional[pd.DataFrame], Optional[str]]:
     """
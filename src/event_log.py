@@ -0,0 +1,342 @@
+import bisect
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.config import LOG_ROTATION, LOG_ROTATE_BYTES, LOG_RETENTION_DAYS, LOG_GZIP
+
+# Append-only JSON Lines event logs: one JSON object per line, appended with a single
+# write. The live file is rotated to '<name>.<timestamp>.jsonl[.gz]' segments
+# by size or by day (config.LOG_ROTATION); segments older than LOG_RETENTION_DAYS are deleted.
+
+# Each new live file starts with a {FILE_ID_FIELD: <random id>} line, so that no two files
+# share a first line (see _file_key); readers skip it
+FILE_ID_FIELD = '_log_file_id'
+
+# Bytes read per step when scanning a file backwards
+_TAIL_BLOCK = 64 * 1024
+
+# In-process indexes per (log path, field), see _file_indexes
+_indexes: Dict = {}
+_index_lock = threading.Lock()
+
+
+def _segments(path: Path) -> List[Path]:
+    """Rotated segments of a log, newest first (timestamps sort lexically)."""
+    return sorted((p for p in path.parent.glob(f"{path.stem}.*.jsonl*") if p.suffix != '.tmp'), reverse=True)
+
+
+def _needs_rotation(path: Path) -> bool:
+    try:
+        st = path.stat()
+    except OSError:
+        return False
+    if st.st_size == 0:
+        return False
+    if LOG_ROTATION == 'day':
+        return datetime.fromtimestamp(st.st_mtime).date() != datetime.now().date()
+    return st.st_size >= LOG_ROTATE_BYTES
+
+
+def _gzip_segment(segment: Path):
+    gz_path = segment.with_name(segment.name + ".gz")
+    tmp_path = gz_path.with_name(f"{gz_path.name}.{os.getpid()}.tmp")
+    with open(segment, 'rb') as src, gzip.open(tmp_path, 'wb') as dst:
+        for block in iter(lambda: src.read(1 << 20), b''):
+            dst.write(block)
+    os.replace(tmp_path, gz_path)
+    segment.unlink()
+
+
+def _prune_segments(path: Path):
+    cutoff = time.time() - LOG_RETENTION_DAYS * 86400
+    for segment in _segments(path):
+        try:
+            if segment.stat().st_mtime < cutoff:
+                segment.unlink()
+        except OSError:
+            pass
+
+
+def rotate(path: Path, force: bool = False) -> Optional[Path]:
+    """Move the live file to a timestamped segment if due (or forced). Returns the segment."""
+    if not (force or _needs_rotation(path)):
+        return None
+    segment = path.with_name(f"{path.stem}.{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}.jsonl")
+    try:
+        # Another process may have rotated it first
+        os.rename(path, segment)
+    except OSError:
+        return None
+    try:
+        if LOG_GZIP:
+            _gzip_segment(segment)
+            segment = segment.with_name(segment.name + ".gz")
+        _prune_segments(path)
+    except Exception as e:
+        print(f"Log rotation error: {e}")
+    return segment
+
+
+def append(path: Path, entries: Iterable[Dict]):
+    """Append entries (one JSON object per line) with a single O_APPEND write."""
+    data = "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in entries)
+    if not data:
+        return
+    rotate(path)
+    if not path.exists():
+        data = _file_header() + data
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(data)
+
+
+def _file_header() -> str:
+    return json.dumps({FILE_ID_FIELD: uuid.uuid4().hex}) + "\n"
+
+
+def _is_entry(obj) -> bool:
+    return isinstance(obj, dict) and FILE_ID_FIELD not in obj
+
+
+def _parse(lines: Iterable[str]) -> List[Dict]:
+    entries = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            # A torn final line from a crashed writer is skipped
+            continue
+        if _is_entry(entry):
+            entries.append(entry)
+    return entries
+
+
+def _read_lines(path: Path) -> List[str]:
+    opener = gzip.open if path.suffix == '.gz' else open
+    try:
+        with opener(path, 'rt', encoding='utf-8') as f:
+            return f.readlines()
+    except OSError:
+        return []
+
+
+def _tail_lines(path: Path, limit: int) -> List[str]:
+    """Last `limit` lines of a plain file, reading backwards from the end."""
+    try:
+        f = open(path, 'rb')
+    except OSError:
+        return []
+    with f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        data = b''
+        while pos > 0 and data.count(b'\n') <= limit:
+            step = min(_TAIL_BLOCK, pos)
+            pos -= step
+            f.seek(pos)
+            data = f.read(step) + data
+    lines = data.decode('utf-8', errors='replace').splitlines()
+    # The first line may be partial unless the file was read from its start
+    if pos > 0:
+        lines = lines[1:]
+    return lines[-limit:] if limit else []
+
+
+def tail(path: Path, limit: int) -> List[Dict]:
+    """Newest `limit` entries, oldest first; continues into rotated segments if needed."""
+    entries = _parse(_tail_lines(path, limit))
+    for segment in _segments(path):
+        if len(entries) >= limit:
+            break
+        older = _parse(_read_lines(segment) if segment.suffix == '.gz' else _tail_lines(segment, limit))
+        entries = older[-(limit - len(entries)):] + entries
+    return entries[-limit:] if limit else []
+
+
+def read_all(path: Path) -> List[Dict]:
+    """Every retained entry, oldest first."""
+    entries = []
+    for segment in reversed(_segments(path)):
+        entries.extend(_parse(_read_lines(segment)))
+    entries.extend(_parse(_read_lines(path)))
+    return entries
+
+
+def _read_complete(path: Path, offset: int, ino: int) -> Tuple[bytes, int]:
+    """Complete lines appended to the live file (inode ino) since offset, and the new offset."""
+    try:
+        with open(path, 'rb') as f:
+            # Rotated between stat and open: the new file is read on the next call
+            if os.fstat(f.fileno()).st_ino != ino:
+                return b'', offset
+            f.seek(offset)
+            data = f.read()
+    except OSError:
+        return b'', offset
+    # A line still being written is left for the next call
+    end = data.rfind(b'\n') + 1
+    return data[:end], offset + end
+
+
+def _read_bytes(path: Path) -> bytes:
+    opener = gzip.open if path.suffix == '.gz' else open
+    try:
+        with opener(path, 'rb') as f:
+            return f.read()
+    except OSError:
+        return b''
+
+
+def _file_key(first_line: bytes) -> str:
+    # Unique per file thanks to the FILE_ID_FIELD header; files written before it by their first entry
+    return hashlib.blake2b(first_line.rstrip(b'\n'), digest_size=8).hexdigest()
+
+
+def _new_file_index() -> Dict:
+    return {'key': None, 'offsets': [], 'timestamps': [], 'positions': {}}
+
+
+def _extend_index(index: Dict, data: bytes, field: str, offset: int):
+    """Adds the entries in data (read from byte offset) to a file index: offsets, timestamps, positions by field."""
+    if index['key'] is None and data:
+        # A file's first line identifies it across rotation (rename + gzip keep the content)
+        index['key'] = _file_key(data.split(b'\n', 1)[0])
+    for line in data.splitlines(keepends=True):
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            entry = None
+        if _is_entry(entry):
+            index['positions'].setdefault(entry.get(field), []).append(len(index['offsets']))
+            index['offsets'].append(offset)
+            index['timestamps'].append(entry.get('timestamp', ''))
+        offset += len(line)
+
+
+def _file_indexes(path: Path, field: str) -> List[Tuple[Path, Dict]]:
+    """
+    (file, index) for every retained segment and the live file, oldest first. An index keeps
+    byte offsets, timestamps and positions per value of field, not the entries. Kept in process:
+    a segment never changes, so it is indexed once and dropped once pruned; appends to the
+    live file are read from the last indexed offset, and a rotation starts a new live index.
+    """
+    try:
+        st = path.stat()
+        live = (st.st_ino, st.st_size)
+    except OSError:
+        live = None
+    segments = _segments(path)
+    with _index_lock:
+        cache = _indexes.setdefault((path, field), {'segments': {}, 'ino': None, 'offset': 0, 'live': _new_file_index()})
+        known = cache['segments']
+        cache['segments'] = {}
+        for segment in segments:
+            if segment not in known:
+                known[segment] = _new_file_index()
+                _extend_index(known[segment], _read_bytes(segment), field, 0)
+            cache['segments'][segment] = known[segment]
+        if live is None or cache['ino'] != live[0] or live[1] < cache['offset']:
+            cache.update(ino=live[0] if live else None, offset=0, live=_new_file_index())
+        if live is not None and live[1] > cache['offset']:
+            start = cache['offset']
+            data, cache['offset'] = _read_complete(path, start, live[0])
+            _extend_index(cache['live'], data, field, start)
+        return [(s, cache['segments'][s]) for s in reversed(segments)] + [(path, cache['live'])]
+
+
+def _read_at(path: Path, key: str, offsets: List[int]) -> List[Dict]:
+    """
+    Entries starting at the given byte offsets (ascending) of one indexed log file.
+    Nothing is read if the file at path is no longer the one indexed (rotated or pruned since).
+    """
+    opener = gzip.open if path.suffix == '.gz' else open
+    entries = []
+    try:
+        with opener(path, 'rb') as f:
+            if _file_key(f.readline()) != key:
+                return []
+            for offset in offsets:
+                f.seek(offset)
+                entries.append(json.loads(f.readline()))
+    except (OSError, ValueError) as e:
+        print(f"Log read error ({path.name}): {e}")
+    return entries
+
+
+def _newest_first(files: List[Tuple[Path, Dict]], value, last_file: int, end_offset: Optional[int]):
+    """(file, position) of the matching entries, newest first, starting before end_offset of files[last_file]."""
+    for i in range(last_file, -1, -1):
+        index = files[i][1]
+        candidates = index['positions'].get(value, []) if value is not None else range(len(index['offsets']))
+        if end_offset is not None and i == last_file:
+            end = bisect.bisect_left(index['offsets'], end_offset)
+            candidates = candidates[:bisect.bisect_left(candidates, end)]
+        for pos in reversed(candidates):
+            yield i, pos
+
+
+def keyed_page(path: Path, field: str, value=None, limit: int = 50, cursor: Optional[str] = None,
+               since: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+    """
+    Newest-first page of the entries whose field equals value (every entry if value is None),
+    stopping at the first one with a 'timestamp' before since. Returns (entries, next_cursor);
+    next_cursor is None on the last page. A cursor is '<file key>:<byte offset>' of the page's
+    last entry, the file key being a hash of the file's first line, so it stays valid when the
+    live file is rotated (and gzipped) and when older segments are pruned.
+    """
+    files = _file_indexes(path, field)
+    last_file, end_offset = len(files) - 1, None
+    if cursor is not None:
+        key, _, offset = cursor.rpartition(':')
+        last_file = next((i for i, (_, index) in enumerate(files) if index['key'] == key), None)
+        if last_file is None:
+            # Its file was pruned, and every older one before it
+            return [], None
+        end_offset = int(offset)
+
+    picked, next_cursor = [], None
+    for i, pos in _newest_first(files, value, last_file, end_offset):
+        index = files[i][1]
+        # Entries are in time order, so the first one before `since` ends the page
+        if since and index['timestamps'][pos] < since:
+            break
+        if len(picked) == limit:
+            last_i, last_pos = picked[-1]
+            next_cursor = f"{files[last_i][1]['key']}:{files[last_i][1]['offsets'][last_pos]}"
+            break
+        picked.append((i, pos))
+
+    entries = {}
+    for i in sorted({i for i, _ in picked}):
+        positions = sorted(pos for j, pos in picked if j == i)
+        read = _read_at(files[i][0], files[i][1]['key'], [files[i][1]['offsets'][pos] for pos in positions])
+        entries.update(zip(((i, pos) for pos in positions), read))
+    return [entries[p] for p in picked if p in entries], next_cursor
+
+
+def migrate_json_list(json_path: Path, path: Path):
+    """One-time conversion of a legacy JSON list file into the JSONL log (the JSON file is kept)."""
+    if path.exists() or _segments(path) or not json_path.exists():
+        return
+    try:
+        with open(json_path, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+    except Exception as e:
+        print(f"Log migration error ({json_path.name}): {e}")
+        return
+    if isinstance(entries, list):
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(_file_header())
+            f.writelines(json.dumps(e, ensure_ascii=False) + "\n" for e in entries if isinstance(e, dict))
+        os.replace(tmp_path, path)
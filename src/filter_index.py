@@ -0,0 +1,174 @@
+import datetime
+import unicodedata
+from typing import Any, Dict, Iterable, List, Optional, Union
+import numpy as np
+import pandas as pd
+
+# Columns indexed per distinct value (keys are NFC-normalized strings)
+VALUE_COLUMNS = ['관리지사', 'SP담당', '영업구역 수정', '영업상태명', '업태구분명']
+
+# Date columns indexed per year-month, with the integer yyyymm key column derived at ingest
+YM_COLUMNS = {'인허가일자': '인허가년월', '폐업일자': '폐업년월'}
+
+# Flag definitions (same rules as the sidebar toggles)
+HOSPITAL_PATTERN = '병원|의원'
+LARGE_AREA_M2 = 330.58
+
+# Bits set per byte value, for counting packed bitmaps
+_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.int64)
+
+
+def ym_key(dates: pd.Series) -> pd.Series:
+    """Integer year-month per date (2026-01-15 -> 202601) as int32, 0 for missing dates."""
+    return (dates.dt.year * 100 + dates.dt.month).fillna(0).astype('int32')
+
+
+def format_ym(key: Any) -> str:
+    """'YYYY-MM' label for an integer yyyymm key; other values (e.g. "전체") pass through."""
+    if isinstance(key, (int, np.integer)):
+        return f"{int(key) // 100:04d}-{int(key) % 100:02d}"
+    return key
+
+
+def _pack(mask) -> np.ndarray:
+    return np.packbits(np.asarray(mask, dtype=bool))
+
+
+def _key(value: Any) -> Any:
+    return unicodedata.normalize('NFC', value) if isinstance(value, str) else value
+
+
+def _value_bitmaps(series: pd.Series, nfc: bool = True) -> Dict[Any, np.ndarray]:
+    """One packed bitmap per distinct value. NaN rows are in none of them. nfc=False keys values as is."""
+    codes, uniques = pd.factorize(series)
+    n_bytes = (len(codes) + 7) // 8
+    # Row positions grouped by code; bits are set straight into each packed bitmap
+    order = np.argsort(codes, kind='stable')
+    bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+    bitmaps: Dict[Any, np.ndarray] = {}
+    for code, value in enumerate(uniques):
+        key = _key(value) if nfc else value
+        rows = order[bounds[code]:bounds[code + 1]]
+        bitmap = np.zeros(n_bytes, dtype=np.uint8)
+        np.bitwise_or.at(bitmap, rows >> 3, (0x80 >> (rows & 7)).astype(np.uint8))
+        # Values that only differ in Unicode form share one key
+        bitmaps[key] = bitmaps[key] | bitmap if key in bitmaps else bitmap
+    return bitmaps
+
+
+def build_filter_index(df: pd.DataFrame, type_col: Optional[str] = None, nfc_columns: Iterable[str] = ()) -> Dict:
+    """
+    Precomputes packed boolean masks (np.packbits, 1 bit per row in df order) for the
+    sidebar filter chain:
+      values - per distinct value of VALUE_COLUMNS (and type_col)
+      ym     - per integer yyyymm of YM_COLUMNS
+      flags  - 'hospital', 'large_area', 'has_phone'
+    plus 'ym_options' (yyyymm keys per date column, newest first) and
+    'days' (최종수정시점 as days since epoch for date-range filters).
+    Filtering is then a few bitwise ANDs; see to_bool to select rows.
+    nfc_columns are already NFC-normalized (data_loader.nfc_columns) and keyed as is.
+    """
+    n = len(df)
+    index: Dict = {'n': n, 'values': {}, 'ym': {}, 'ym_options': {}, 'flags': {}, 'days': None}
+
+    value_cols = VALUE_COLUMNS + ([type_col] if type_col and type_col not in VALUE_COLUMNS else [])
+    for col in value_cols:
+        if col in df.columns:
+            index['values'][col] = _value_bitmaps(df[col], nfc=col not in nfc_columns)
+
+    for col, key_col in YM_COLUMNS.items():
+        if key_col in df.columns:
+            keys = df[key_col]
+        elif col in df.columns and pd.api.types.is_datetime64_any_dtype(df[col]):
+            keys = ym_key(df[col])
+        else:
+            continue
+        # Key 0 marks a missing date and is not selectable
+        bitmaps = _value_bitmaps(keys)
+        index['ym'][col] = {int(k): b for k, b in bitmaps.items() if k}
+        index['ym_options'][col] = sorted(index['ym'][col], reverse=True)
+
+    type_col = type_col or '업태구분명'
+    if type_col in df.columns:
+        hospital = df[type_col].astype(str).str.contains(HOSPITAL_PATTERN, na=False)
+        if '개방서비스명' in df.columns:
+            hospital = hospital | df['개방서비스명'].astype(str).str.contains(HOSPITAL_PATTERN, na=False)
+        index['flags']['hospital'] = _pack(hospital)
+    if '소재지면적' in df.columns:
+        index['flags']['large_area'] = _pack(pd.to_numeric(df['소재지면적'], errors='coerce').fillna(0) >= LARGE_AREA_M2)
+    if '소재지전화' in df.columns:
+        index['flags']['has_phone'] = _pack(df['소재지전화'].notna() & (df['소재지전화'] != ""))
+
+    if '최종수정시점' in df.columns and pd.api.types.is_datetime64_any_dtype(df['최종수정시점']):
+        # NaT (no 인허가일자/폐업일자) becomes the minimum int64; date_range_mask reads it as today
+        index['days'] = df['최종수정시점'].values.astype('datetime64[D]').astype(np.int64)
+
+    return index
+
+
+def all_rows(index: Dict) -> np.ndarray:
+    return _pack(np.ones(index['n'], dtype=bool))
+
+
+def no_rows(index: Dict) -> np.ndarray:
+    return np.zeros((index['n'] + 7) // 8, dtype=np.uint8)
+
+
+def invert(index: Dict, bitmap: np.ndarray) -> np.ndarray:
+    """NOT of a bitmap, keeping the padding bits past n cleared."""
+    return all_rows(index) & ~bitmap
+
+
+def values_mask(index: Dict, column: str, values: Union[Any, Iterable[Any]]) -> np.ndarray:
+    """Rows whose column equals the value (or any of a list of values)."""
+    if isinstance(values, (str, bytes)) or not isinstance(values, Iterable):
+        values = [values]
+    bitmaps = index['values'].get(column, {})
+    result = no_rows(index)
+    for value in values:
+        bitmap = bitmaps.get(_key(value))
+        if bitmap is not None:
+            result = result | bitmap
+    return result
+
+
+def ym_mask(index: Dict, column: str, ym: int) -> np.ndarray:
+    """Rows whose date column falls in the year-month ym (integer yyyymm)."""
+    bitmap = index['ym'].get(column, {}).get(ym)
+    return bitmap if bitmap is not None else no_rows(index)
+
+
+def ym_options(index: Dict, column: str) -> List[int]:
+    """Year-month keys present in a date column, newest first."""
+    return index['ym_options'].get(column, [])
+
+
+def flag_mask(index: Dict, name: str) -> Optional[np.ndarray]:
+    """Precomputed flag bitmap, or None if the source column is missing."""
+    return index['flags'].get(name)
+
+
+def date_range_mask(index: Dict, start, end, today=None) -> Optional[np.ndarray]:
+    """Rows whose 최종수정시점 date is within [start, end] (datetime.date), or None if not indexed.
+
+    Rows without a 최종수정시점 count as modified today (default: the current date).
+    """
+    if index['days'] is None:
+        return None
+    lo = np.datetime64(start, 'D').astype(np.int64)
+    hi = np.datetime64(end, 'D').astype(np.int64)
+    days = index['days']
+    missing = days == np.datetime64('NaT', 'D').astype(np.int64)
+    if missing.any():
+        now = np.datetime64(today or datetime.date.today(), 'D').astype(np.int64)
+        days = np.where(missing, now, days)
+    return _pack((days >= lo) & (days <= hi))
+
+
+def count(bitmap: np.ndarray) -> int:
+    return int(_POPCOUNT[bitmap].sum())
+
+
+def to_bool(index: Dict, bitmap: np.ndarray) -> np.ndarray:
+    """Boolean row mask (length n) for a bitmap."""
+    return np.unpackbits(bitmap, count=index['n']).astype(bool)
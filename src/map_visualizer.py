@@ -44,7 +44,8 @@ def render_kakao_map(map_df, kakao_key):
     display_df['title'] = display_df['사업장명'].apply(clean_str)
     display_df['addr'] = display_df['소재지전체주소'].fillna('').apply(clean_str)
     display_df['tel'] = display_df['소재지전화'].fillna('')
-    display_df['status'] = display_df['영업상태명'].fillna('')
+    # Status/type/branch/manager columns may be categorical (data_loader._compact_dtypes): fill as object
+    display_df['status'] = display_df['영업상태명'].astype(object).fillna('')
     
     # Date Formatting
     def format_date(d):
@@ -58,11 +59,11 @@ def render_kakao_map(map_df, kakao_key):
     display_df['modified_date'] = display_df['최종수정시점'].apply(format_date) if '최종수정시점' in display_df.columns else ''
     
     # [FEATURE] Business Type
-    display_df['biz_type'] = display_df['업태구분명'].fillna('') if '업태구분명' in display_df.columns else ''
+    display_df['biz_type'] = display_df['업태구분명'].astype(object).fillna('') if '업태구분명' in display_df.columns else ''
     
     # [FEATURE] Branch & Manager info
-    display_df['branch'] = display_df['관리지사'].fillna('') if '관리지사' in display_df.columns else ''
-    display_df['manager'] = display_df['SP담당'].fillna('') if 'SP담당' in display_df.columns else ''
+    display_df['branch'] = display_df['관리지사'].astype(object).fillna('') if '관리지사' in display_df.columns else ''
+    display_df['manager'] = display_df['SP담당'].astype(object).fillna('') if 'SP담당' in display_df.columns else ''
     
     # [FEATURE] Large Area Flag (>= 100py approx 330m2)
     def check_large(row):
@@ -382,14 +383,14 @@ def render_folium_map(display_df):
     if '최종수정시점' in map_data_df.columns: map_data_df['modified_date'] = map_data_df['최종수정시점'].apply(format_date_simple)
     if '재개업일자' in map_data_df.columns: map_data_df['reopen_date'] = map_data_df['재개업일자'].apply(format_date_simple)
     
-    # Fill defaults
+    # Fill defaults (categorical columns are filled as object, "-" is not one of their categories)
     map_data_df['title'] = map_data_df['사업장명'].fillna('상호미상')
-    map_data_df['status'] = map_data_df['영업상태명'].fillna("-")
+    map_data_df['status'] = map_data_df['영업상태명'].astype(object).fillna("-")
     map_data_df['addr'] = map_data_df['소재지전체주소'].fillna("-")
     map_data_df['tel'] = map_data_df['소재지전화'].fillna("").replace('nan', '')
-    map_data_df['branch'] = map_data_df['관리지사'].fillna("-")
-    map_data_df['manager'] = map_data_df['SP담당'].fillna("-")
-    map_data_df['biz_type'] = map_data_df['업태구분명'].fillna("-")
+    map_data_df['branch'] = map_data_df['관리지사'].astype(object).fillna("-")
+    map_data_df['manager'] = map_data_df['SP담당'].astype(object).fillna("-")
+    map_data_df['biz_type'] = map_data_df['업태구분명'].astype(object).fillna("-")
     
     # Check for '평수' or calculate it (Assuming 1 '소재지면적' unit approx to meters, usually m2)
     # If logic exists elsewhere, reuse. Here we approximate if '평수' column exists.
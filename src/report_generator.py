@@ -22,6 +22,7 @@ def generate_static_report(zip_path, district_path):
     
     # Branch Stats
     branch_counts = df['관리지사'].value_counts()
+    branch_counts = branch_counts[branch_counts > 0]  # categorical: skip branches not in df
     
     # Recent Activity (Last 30 Days)
     today = pd.Timestamp.now()
@@ -29,7 +30,7 @@ def generate_static_report(zip_path, district_path):
     
     # Safe date parsing
     df['reopen_dt'] = pd.to_datetime(df['재개업일자'], errors='coerce')
-    df['modified_dt'] = pd.to_datetime(df['최종수정시점'], errors='coerce')
+    df['modified_dt'] = pd.to_datetime(df['최종수정시점'], errors='coerce').fillna(today)  # missing = now (see data_loader)
     
     recent_reopen = len(df[df['reopen_dt'] >= month_ago])
     recent_mod = len(df[df['modified_dt'] >= month_ago])
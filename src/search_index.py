@@ -0,0 +1,122 @@
+import re
+import unicodedata
+from typing import Dict, Iterable, List
+import numpy as np
+import pandas as pd
+
+# Columns covered by keyword search
+SEARCH_COLUMNS = ['소재지전체주소', '사업장명']
+
+
+def split_keywords(text: str) -> List[str]:
+    """NFC-normalized, lower-cased keywords split on '/' and whitespace."""
+    text = unicodedata.normalize('NFC', text or '').strip().lower()
+    return [k for k in re.split(r'[/\s]+', text) if k]
+
+
+def _prepare_texts(series: pd.Series, nfc: bool = True) -> np.ndarray:
+    texts = series.astype(str)
+    if nfc:
+        texts = texts.str.normalize('NFC')
+    return texts.str.lower().to_numpy(dtype=object)
+
+
+def _bigram_pairs(texts: np.ndarray):
+    """(bigram key, row) for every character bigram of every text, as uint64 / int64 arrays."""
+    lengths = np.fromiter((len(t) for t in texts), dtype=np.int64, count=len(texts))
+    if lengths.sum() == 0:
+        return np.empty(0, dtype=np.uint64), np.empty(0, dtype=np.int64)
+    chars = np.frombuffer(''.join(texts).encode('utf-32-le'), dtype=np.uint32).astype(np.uint64)
+    rows = np.repeat(np.arange(len(texts)), lengths)
+    # Only pairs of characters from the same text
+    same_text = rows[:-1] == rows[1:]
+    keys = (chars[:-1] << np.uint64(32)) | chars[1:]
+    return keys[same_text], rows[:-1][same_text]
+
+
+def _bigram_key(a: str, b: str) -> np.uint64:
+    return np.uint64((ord(a) << 32) | ord(b))
+
+
+def build_search_index(df: pd.DataFrame, columns: List[str] = SEARCH_COLUMNS, nfc_columns: Iterable[str] = ()) -> Dict:
+    """
+    Inverted index from character bigrams to row positions over the search columns.
+    Texts are NFC-normalized and lower-cased. Postings are stored as one sorted int32
+    array ('rows') sliced by 'starts', with 'keys' sorted for binary search.
+    nfc_columns are already NFC-normalized (data_loader.nfc_columns) and only lower-cased.
+    """
+    texts = {col: _prepare_texts(df[col], nfc=col not in nfc_columns) for col in columns if col in df.columns}
+    pairs = [_bigram_pairs(t) for t in texts.values()]
+    keys = np.concatenate([k for k, _ in pairs]) if pairs else np.empty(0, dtype=np.uint64)
+    rows = np.concatenate([r for _, r in pairs]) if pairs else np.empty(0, dtype=np.int64)
+
+    # Sort by (key, row) and drop repeats, so each posting list is sorted and unique
+    order = np.lexsort((rows, keys))
+    keys, rows = keys[order], rows[order]
+    if len(keys):
+        keep = np.ones(len(keys), dtype=bool)
+        keep[1:] = (keys[1:] != keys[:-1]) | (rows[1:] != rows[:-1])
+        keys, rows = keys[keep], rows[keep]
+    unique_keys, starts = np.unique(keys, return_index=True)
+
+    return {
+        'n': len(df),
+        'labels': df.index,
+        'texts': texts,
+        'keys': unique_keys,
+        'starts': np.append(starts, len(keys)),
+        'rows': rows.astype(np.int32),
+    }
+
+
+def _posting(index: Dict, key: np.uint64) -> np.ndarray:
+    i = np.searchsorted(index['keys'], key)
+    if i == len(index['keys']) or index['keys'][i] != key:
+        return np.empty(0, dtype=np.int32)
+    return index['rows'][index['starts'][i]:index['starts'][i + 1]]
+
+
+def _scan(index: Dict, keyword: str, rows=None) -> np.ndarray:
+    """Rows (of `rows`, or all) whose text contains the keyword, checked directly."""
+    candidates = np.arange(index['n']) if rows is None else rows
+    hit = np.zeros(len(candidates), dtype=bool)
+    for texts in index['texts'].values():
+        hit |= np.fromiter((keyword in texts[r] for r in candidates), dtype=bool, count=len(candidates))
+    return candidates[hit]
+
+
+def match_keyword(index: Dict, keyword: str) -> np.ndarray:
+    """Sorted row positions whose search columns contain the keyword (case-insensitive)."""
+    keyword = unicodedata.normalize('NFC', keyword).lower()
+    if len(keyword) < 2:
+        return _scan(index, keyword)
+
+    postings = sorted((_posting(index, _bigram_key(a, b)) for a, b in zip(keyword, keyword[1:])), key=len)
+    candidates = postings[0]
+    for posting in postings[1:]:
+        if not len(candidates):
+            break
+        candidates = np.intersect1d(candidates, posting, assume_unique=True)
+
+    # A single bigram is exact; longer keywords need the bigrams in sequence, in one column
+    if len(keyword) == 2 or not len(candidates):
+        return candidates
+    return _scan(index, keyword, candidates)
+
+
+def search(index: Dict, keywords: List[str], mode: str = 'or') -> np.ndarray:
+    """Boolean mask over the indexed rows: any keyword ('or') or all keywords ('and')."""
+    mask = np.zeros(index['n'], dtype=bool) if mode == 'or' else np.ones(index['n'], dtype=bool)
+    for keyword in keywords:
+        hit = np.zeros(index['n'], dtype=bool)
+        hit[match_keyword(index, keyword)] = True
+        mask = mask | hit if mode == 'or' else mask & hit
+    return mask
+
+
+def filter_frame(index: Dict, frame: pd.DataFrame, keywords: List[str], mode: str = 'or') -> pd.DataFrame:
+    """Rows of `frame` (a subset of the indexed DataFrame, same index labels) matching the keywords."""
+    if not keywords:
+        return frame
+    mask = search(index, keywords, mode)
+    return frame[mask[index['labels'].get_indexer(frame.index)]]
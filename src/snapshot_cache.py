@@ -0,0 +1,110 @@
+import os
+import hashlib
+from pathlib import Path
+import pandas as pd
+
+# Parquet needs pyarrow (installed with streamlit); without it the cache is a no-op
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+# Storage directory (same root as activity_logger)
+BASE_DIR = Path(os.path.abspath(__file__)).parent.parent
+SNAPSHOT_DIR = BASE_DIR / "storage" / "snapshots"
+
+# Bump when the processing pipeline changes its output, so old snapshots are ignored
+SNAPSHOT_VERSION = 12
+
+# Number of snapshots kept on disk (oldest are pruned on save)
+KEEP_SNAPSHOTS = 3
+
+
+def _update_hash(h, source):
+    """Feed a path or an uploaded file object into the hash, 1MB at a time."""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                h.update(block)
+    elif hasattr(source, 'getvalue'):
+        h.update(source.getvalue())
+    else:
+        pos = source.tell()
+        source.seek(0)
+        for block in iter(lambda: source.read(1 << 20), b''):
+            h.update(block)
+        source.seek(pos)
+
+
+def compute_snapshot_key(*sources):
+    """
+    Content hash of the input files (ZIP, district Excel) plus SNAPSHOT_VERSION.
+    Returns None if any input cannot be read.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"v{SNAPSHOT_VERSION}".encode())
+    try:
+        for source in sources:
+            _update_hash(h, source)
+    except Exception as e:
+        print(f"Snapshot key error: {e}")
+        return None
+    return h.hexdigest()
+
+
+def _snapshot_paths(key):
+    return SNAPSHOT_DIR / f"{key}.final.parquet", SNAPSHOT_DIR / f"{key}.mgr.parquet"
+
+
+def _atomic_to_parquet(df, path):
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def load_snapshot(key):
+    """Return (final_df, mgr_info) for a key, or None on a miss."""
+    if not HAS_PYARROW or not key:
+        return None
+    final_path, mgr_path = _snapshot_paths(key)
+    if not final_path.exists() or not mgr_path.exists():
+        return None
+    try:
+        final_df = pd.read_parquet(final_path)
+        mgr_info = pd.read_parquet(mgr_path).to_dict(orient='records')
+    except Exception as e:
+        print(f"Snapshot load error: {e}")
+        return None
+    return final_df, mgr_info
+
+
+def save_snapshot(key, final_df, mgr_info):
+    """Write final_df and mgr_info as Parquet. Failures are logged, never raised."""
+    if not HAS_PYARROW or not key:
+        return False
+    final_path, mgr_path = _snapshot_paths(key)
+    try:
+        SNAPSHOT_DIR.mkdir(parents=True, exist_ok=True)
+        # mgr first: the final file appearing marks a complete snapshot
+        _atomic_to_parquet(pd.DataFrame(mgr_info), mgr_path)
+        _atomic_to_parquet(final_df.reset_index(drop=True), final_path)
+    except Exception as e:
+        print(f"Snapshot save error: {e}")
+        return False
+    prune_snapshots()
+    return True
+
+
+def prune_snapshots(keep=KEEP_SNAPSHOTS):
+    """Delete all but the `keep` most recent snapshots."""
+    if not SNAPSHOT_DIR.exists():
+        return
+    finals = sorted(SNAPSHOT_DIR.glob("*.final.parquet"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for final_path in finals[keep:]:
+        key = final_path.name.split('.')[0]
+        for path in _snapshot_paths(key):
+            try:
+                path.unlink()
+            except OSError:
+                pass
@@ -1,4 +1,5 @@
 import pandas as pd
+import numpy as np
 import re
 import unicodedata
 import os
@@ -8,7 +9,7 @@ from difflib import SequenceMatcher
 
 # Check for rapidfuzz for better performance, fallback to difflib
 try:
-    from rapidfuzz import fuzz
+    from rapidfuzz import fuzz, process
     HAS_RAPIDFUZZ = True
 except ImportError:
     HAS_RAPIDFUZZ = False
@@ -23,10 +24,14 @@ except ImportError:
     HAS_PYPROJ = False
     transformer = None
 
-def normalize_address(address):
+# Shortest normalized address the matching pipeline accepts
+MIN_ADDRESS_LENGTH = 8
+
+def normalize_address(address, min_length=MIN_ADDRESS_LENGTH):
     """
     Normalizes a Korean address string.
     Removes special characters, standardizes region names.
+    Returns None for masked addresses or ones shorter than min_length.
     """
     if pd.isna(address):
         return None
@@ -43,11 +48,51 @@ def normalize_address(address):
     address = address.replace('  ', ' ') # Double spaces
     address = address.replace('-', '')
     
-    if '*' in address or len(address) < 8:  # Too short or masked
+    if '*' in address or len(address) < min_length:  # Too short or masked
         return None
         
     return address.strip()
 
+# Precompiled pieces of normalize_address for the vectorized variant
+_BRACKET_RE = re.compile(r'\([^)]*\)')
+_REGION_ALIASES = {'강원특별자치도': '강원도', '세종특별자치시': '세종시', '서울특별시': '서울시'}
+_REGION_RE = re.compile('|'.join(_REGION_ALIASES))
+_DASH_TABLE = str.maketrans('', '', '-')
+
+def normalize_address_series(addresses, min_length=MIN_ADDRESS_LENGTH):
+    """
+    Vectorized normalize_address over a whole Series.
+    Gives exactly the scalar results, element for element (None where the scalar returns None).
+    """
+    result = pd.Series([None] * len(addresses), index=addresses.index, dtype=object)
+    present = addresses.notna()
+    if not present.any():
+        return result
+    
+    s = addresses[present].astype(str).str.strip()
+    s = s.str.replace(_BRACKET_RE, '', regex=True)
+    s = s.str.replace(_REGION_RE, lambda m: _REGION_ALIASES[m.group(0)], regex=True)
+    s = s.str.replace('  ', ' ', regex=False)
+    s = s.str.translate(_DASH_TABLE)
+    
+    # Too short or masked
+    invalid = s.str.contains('*', regex=False) | (s.str.len() < min_length)
+    result[present] = s.str.strip().where(~invalid, None)
+    return result
+
+def mask_name(name):
+    """
+    Masks Korean names: 홍길동 -> 홍*동, 이철 -> 이*
+    """
+    if not name or pd.isna(name):
+        return name
+    name_str = str(name)
+    if len(name_str) <= 1:
+        return name_str
+    if len(name_str) == 2:
+        return name_str[0] + "*"
+    return name_str[0] + "*" * (len(name_str) - 2) + name_str[-1]
+
 def parse_coordinates_row(row, x_col, y_col):
     """
     Helper to parse and convert coordinates.
@@ -143,6 +188,85 @@ def get_best_match(address, choices, vectorizer, tfidf_matrix, threshold=0.7):
     
     return None
 
+# Stage labels reported by get_best_matches
+MATCH_STAGES = ['missing', 'low_cosine', 'cosine', 'fuzzy', 'rejected']
+
+def _fuzzy_scores(queries, candidate_idx, choices, workers):
+    """Edit-distance ratio (0-1) of each query against its own candidate row of choices."""
+    if HAS_RAPIDFUZZ:
+        # One cdist over the union of this chunk's candidates, then gather each query's columns
+        union, inverse = np.unique(candidate_idx, return_inverse=True)
+        inverse = inverse.reshape(candidate_idx.shape)
+        union_choices = [str(choices[i]) for i in union]
+        matrix = process.cdist(queries, union_choices, scorer=fuzz.ratio, dtype=np.float32, workers=workers)
+        return np.take_along_axis(matrix, inverse, axis=1) / 100.0
+    
+    scores = np.zeros(candidate_idx.shape, dtype=np.float32)
+    for r, query in enumerate(queries):
+        for c, idx in enumerate(candidate_idx[r]):
+            scores[r, c] = SequenceMatcher(None, query, str(choices[idx])).ratio()
+    return scores
+
+def get_best_matches(addresses, choices, vectorizer, tfidf_matrix, threshold=0.7,
+                     min_cosine=0.4, top_n=5, chunk_size=256, workers=-1):
+    """
+    Batch variant of get_best_match for a list of addresses.
+    Returns (matches, scores, stages): the matched choice or None, the final score,
+    and which stage decided each address (see MATCH_STAGES).
+    """
+    addresses = list(addresses)
+    n = len(addresses)
+    matches = [None] * n
+    scores = np.zeros(n, dtype=np.float32)
+    stages = ['missing'] * n
+    
+    valid = [i for i, a in enumerate(addresses) if not pd.isna(a)]
+    top_n = min(top_n, tfidf_matrix.shape[0])
+    if not valid or top_n == 0:
+        return matches, scores, stages
+    
+    for start in range(0, len(valid), chunk_size):
+        rows = valid[start:start + chunk_size]
+        queries = [str(addresses[i]) for i in rows]
+        cosine_sim = cosine_similarity(vectorizer.transform(queries), tfidf_matrix)
+        
+        # Top-k candidates per row without sorting the whole score vector
+        top_idx = np.argpartition(cosine_sim, -top_n, axis=1)[:, -top_n:]
+        top_sim = np.take_along_axis(cosine_sim, top_idx, axis=1)
+        order = np.argsort(-top_sim, axis=1, kind='stable')
+        top_idx = np.take_along_axis(top_idx, order, axis=1)
+        best_cosine = np.take_along_axis(top_sim, order, axis=1)[:, 0]
+        
+        # Rows still undecided after the cosine checks go to edit distance
+        refine = np.flatnonzero((best_cosine >= min_cosine) & (best_cosine < 0.85))
+        fuzzy = None
+        if len(refine):
+            fuzzy = _fuzzy_scores([queries[r] for r in refine], top_idx[refine], choices, workers)
+        
+        for r, i in enumerate(rows):
+            cos = float(best_cosine[r])
+            scores[i] = cos
+            if cos < min_cosine:
+                stages[i] = 'low_cosine'
+            elif cos >= 0.85:
+                matches[i] = choices[top_idx[r, 0]]
+                stages[i] = 'cosine'
+        
+        for k, r in enumerate(refine):
+            i = rows[r]
+            # First candidate with the highest ratio, as in the single-address loop
+            best = int(np.argmax(fuzzy[k]))
+            best_score = float(fuzzy[k, best])
+            final_score = max(best_score, float(best_cosine[r]))
+            scores[i] = final_score
+            if final_score >= threshold and best_score > 0:
+                matches[i] = choices[top_idx[r, best]]
+                stages[i] = 'fuzzy'
+            else:
+                stages[i] = 'rejected'
+    
+    return matches, scores, stages
+
 def calculate_area(row):
     val = row.get('소재지면적', 0)
     if pd.isna(val) or val == 0: val = row.get('총면적', 0)
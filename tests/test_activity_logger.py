@@ -0,0 +1,128 @@
+import json
+import os
+import threading
+import pandas as pd
+from src import activity_db, activity_logger
+
+def _use_tmp_storage(monkeypatch, tmp_path):
+    monkeypatch.setattr(activity_logger, 'BACKEND', 'json')
+    monkeypatch.setattr(activity_logger, 'ACTIVITY_STATUS_FILE', tmp_path / 'activity_status.json')
+    monkeypatch.setattr(activity_logger, 'CHANGE_HISTORY_FILE', tmp_path / 'change_history.json')
+
+def test_bulk_statuses_match_single_lookups(monkeypatch, tmp_path):
+    _use_tmp_storage(monkeypatch, tmp_path)
+    assert activity_logger.get_statuses(['a_1']).loc['a_1'].tolist() == ['', '', '', '']
+
+    activity_logger.save_activity_status('a_1', '🟡 상담중', '재방문', '김민수')
+    activity_logger.save_activity_status('b_2', '🟢 계약완료', '', '이영희')
+    statuses = activity_logger.get_statuses(['b_2', 'a_1', 'c_3', 'a_1'])
+    assert statuses.index.tolist() == ['b_2', 'a_1', 'c_3']
+    for key in statuses.index:
+        assert statuses.loc[key].to_dict() == activity_logger.get_activity_status(key)
+
+def test_cache_reloads_when_file_changes(monkeypatch, tmp_path):
+    _use_tmp_storage(monkeypatch, tmp_path)
+    activity_logger.save_activity_status('a_1', '🟡 상담중', '', '김민수')
+    assert activity_logger.get_activity_status('a_1')['활동진행상태'] == '🟡 상담중'
+
+    # Another process rewrites the file
+    path = activity_logger.ACTIVITY_STATUS_FILE
+    path.write_text(json.dumps({'a_1': {'활동진행상태': '🔴 상담불가', '특이사항': '', '변경일시': '', '변경자': ''}}), encoding='utf-8')
+    os.utime(path, ns=(1, 1))
+    assert activity_logger.get_activity_status('a_1')['활동진행상태'] == '🔴 상담불가'
+    assert activity_logger.get_statuses(['a_1']).loc['a_1', '활동진행상태'] == '🔴 상담불가'
+
+def test_record_keys_match_row_keys():
+    df = pd.DataFrame({'사업장명': ['카페', None], '소재지전체주소': ['서울 강남구', '부산 해운대구']})
+    expected = [activity_logger.get_record_key(row) for _, row in df.iterrows()]
+    assert activity_logger.get_record_keys(df).tolist() == expected
+
+def _use_tmp_db(monkeypatch, tmp_path):
+    monkeypatch.setattr(activity_logger, 'BACKEND', 'sqlite')
+    monkeypatch.setattr(activity_db, 'DB_FILE', tmp_path / 'activity.db')
+
+def test_sqlite_backend_status_and_history(monkeypatch, tmp_path):
+    _use_tmp_db(monkeypatch, tmp_path)
+    activity_logger.save_activity_status('a_1', '🟡 상담중', '재방문', '김민수')
+    activity_logger.save_activity_status('a_1', '🟡 상담중', '재방문', '김민수')  # no change, no history
+    activity_logger.save_activity_status('a_1', '🟢 계약완료', '', '이영희')
+    status = activity_logger.get_activity_status('a_1')
+    assert status['활동진행상태'] == '🟢 계약완료' and status['변경자'] == '이영희'
+    assert activity_logger.get_activity_status('zz')['활동진행상태'] == ''
+    assert activity_logger.get_statuses(['a_1', 'zz']).loc['a_1', '활동진행상태'] == '🟢 계약완료'
+
+    history = activity_logger.get_change_history(record_key='a_1')
+    assert [(h['old_status'], h['new_status']) for h in history] == [('', '🟡 상담중'), ('🟡 상담중', '🟢 계약완료')]
+    assert activity_logger.get_change_history(record_key='zz') == []
+
+def test_sqlite_backend_migrates_json(monkeypatch, tmp_path):
+    (tmp_path / 'activity_status.json').write_text(json.dumps(
+        {'a_1': {'활동진행상태': '🔴 상담불가', '특이사항': '폐업예정', '변경일시': '2026-01-02 10:00:00', '변경자': '김민수'}}), encoding='utf-8')
+    (tmp_path / 'access_logs.json').write_text(json.dumps(
+        [{'timestamp': '2026-01-02 09:00:00', 'user_role': 'admin', 'user_name': '관리자', 'action': 'login'}]), encoding='utf-8')
+    _use_tmp_db(monkeypatch, tmp_path)
+    assert activity_logger.get_activity_status('a_1')['특이사항'] == '폐업예정'
+    assert activity_logger.get_access_logs()[0]['user_name'] == '관리자'
+
+def test_sqlite_backend_concurrent_writers(monkeypatch, tmp_path):
+    _use_tmp_db(monkeypatch, tmp_path)
+
+    def worker(n):
+        for i in range(25):
+            activity_logger.log_view('manager', f'user{n}', '필터/검색', str(i))
+            activity_logger.save_activity_status(f'k{n}_{i}', '🟡 상담중', '', f'user{n}')
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(activity_logger.get_view_logs(limit=1000)) == 200
+    assert len(activity_logger.get_change_history(limit=1000)) == 200
+    assert (activity_logger.get_statuses([f'k{n}_{i}' for n in range(8) for i in range(25)])['활동진행상태'] == '🟡 상담중').all()
+
+def test_changed_statuses_diffs_edited_grid():
+    original = pd.DataFrame({'record_key': ['a', 'b', 'c'], '활동진행상태': ['', '🟡 상담중', ''], '특이사항': ['', '', '메모']})
+    edited = original.copy()
+    edited.loc[0, '활동진행상태'] = '🟢 계약완료'
+    edited.loc[2, '특이사항'] = None
+    edited.loc[1, '특이사항'] = ''
+    changes = activity_logger.changed_statuses(original, edited)
+    assert changes['record_key'].tolist() == ['a', 'c']
+    assert changes['특이사항'].tolist() == ['', '']
+
+def test_bulk_save_both_backends(monkeypatch, tmp_path):
+    for use in (_use_tmp_storage, _use_tmp_db):
+        (tmp_path / use.__name__).mkdir()
+        use(monkeypatch, tmp_path / use.__name__)
+        activity_logger.save_activity_status('a', '🟡 상담중', '', '김민수')
+        changes = pd.DataFrame({'record_key': ['a', 'b'], '활동진행상태': ['🟢 계약완료', '🔴 상담불가'], '특이사항': ['', '폐업']})
+        assert activity_logger.save_activity_statuses_bulk(changes, '이영희') == 2
+        assert activity_logger.save_activity_statuses_bulk(changes.iloc[:0], '이영희') == 0
+        statuses = activity_logger.get_statuses(['a', 'b'])
+        assert statuses['활동진행상태'].tolist() == ['🟢 계약완료', '🔴 상담불가']
+        assert statuses['변경자'].tolist() == ['이영희', '이영희']
+        history = activity_logger.get_change_history(limit=10)
+        assert [(h['record_key'], h['old_status'], h['new_status']) for h in history[-2:]] == [
+            ('a', '🟡 상담중', '🟢 계약완료'), ('b', '', '🔴 상담불가')]
+
+def test_change_history_pages_both_backends(monkeypatch, tmp_path):
+    for use in (_use_tmp_storage, _use_tmp_db):
+        (tmp_path / use.__name__).mkdir()
+        use(monkeypatch, tmp_path / use.__name__)
+        for i in range(7):
+            activity_logger.log_change_history(f'k{i % 2}', {}, {'활동진행상태': str(i)}, 'u')
+
+        assert [h['new_status'] for h in activity_logger.get_change_history(record_key='k1')] == ['1', '3', '5']
+        seen, cursor = [], None
+        while True:
+            page = activity_logger.get_change_history_page(record_key='k0', limit=3, cursor=cursor)
+            seen += [h['new_status'] for h in page['entries']]
+            cursor = page['next_cursor']
+            if cursor is None:
+                break
+        assert seen == ['6', '4', '2', '0']
+        page = activity_logger.get_change_history_page(limit=7)
+        assert len(page['entries']) == 7 and page['next_cursor'] is None
+        assert activity_logger.get_change_history_page(since='2999-01-01')['entries'] == []
+        assert len(activity_logger.get_change_history_page(since='2000-01-01', limit=50)['entries']) == 7
@@ -0,0 +1,82 @@
+from sklearn.feature_extraction.text import TfidfVectorizer
+from src import address_matcher
+
+DISTRICT = ["서울 동대문구 용두동", "서울 중구 을지로3가", "경기 고양시 덕양구 선유동", "강원 원주시 태장2동"]
+
+def _match(targets):
+    vectorizer = TfidfVectorizer(analyzer='char', ngram_range=(2, 3)).fit(DISTRICT)
+    index = address_matcher.build_district_index(DISTRICT, DISTRICT)
+    return address_matcher.match_addresses(targets, index, vectorizer, vectorizer.transform(DISTRICT), DISTRICT)
+
+def test_match_addresses_stages():
+    results, _, outcomes, stats = _match([
+        "서울 동대문구 용두동",                 # exact
+        "서울시 중구 을지로3가 101",            # token (1-token 시군구)
+        "경기도 고양시 덕양구 선유동 12-3",     # token (2-token 시군구)
+        "강원도 원주시 태장2동 55",             # token
+        "부산시 해운대구 우동 1",               # no candidate
+    ])
+    assert results == DISTRICT + [None]
+    assert outcomes == ['exact', 'token', 'token', 'token', 'no_block']
+    assert stats == {'exact': 1, 'token': 3, 'cosine': 0, 'unmatched': 1, 'no_block': 1, 'dong_mismatch': 0, 'below_threshold': 0}
+
+def test_match_addresses_cosine_fallback():
+    results, _, outcomes, stats = _match(["서울시 동대문구 용두1동 12"])
+    assert results == ["서울 동대문구 용두동"]
+    assert stats['cosine'] == 1
+
+def test_match_addresses_rejects_neighbouring_dong():
+    district = ["강원 삼척시 성북동", "강원 춘천시 중앙로3가"]
+    vectorizer = TfidfVectorizer(analyzer='char', ngram_range=(2, 3)).fit(district)
+    index = address_matcher.build_district_index(district, district)
+    results, scores, outcomes, stats = address_matcher.match_addresses(
+        ["강원 삼척시 성내동 17-18", "강원 춘천시 중앙로2가 83번지"], index, vectorizer,
+        vectorizer.transform(district), district, threshold=0.3)
+    assert min(scores) >= 0.3
+    assert results == [None, None] and outcomes == ['dong_mismatch'] * 2
+    assert stats['dong_mismatch'] == 2 and stats['below_threshold'] == 0
+
+def test_sparse_top1_matches_dense_cosine():
+    import numpy as np
+    from sklearn.metrics.pairwise import cosine_similarity
+    vectorizer = TfidfVectorizer(analyzer='char', ngram_range=(2, 3)).fit(DISTRICT)
+    corpus = vectorizer.transform(DISTRICT)
+    queries = vectorizer.transform(["서울시 중구 을지로 3가", "고양시 선유동", "zzzz"])
+    dense = cosine_similarity(queries, corpus)
+
+    best_idx, best_score = address_matcher.sparse_top1(queries, corpus, chunk_size=2, memory_budget_mb=1e-5)
+    assert list(best_idx[:2]) == list(dense.argmax(axis=1)[:2])
+    assert np.allclose(best_score, dense.max(axis=1))
+    assert best_idx[2] == -1
+
+def test_get_district_vectorizer_persists(tmp_path, monkeypatch):
+    monkeypatch.setattr(address_matcher, "MATCHER_DIR", tmp_path)
+    monkeypatch.setattr(address_matcher, "_vectorizer_cache", {})
+    vectorizer, matrix = address_matcher.get_district_vectorizer(DISTRICT)
+    assert len(list(tmp_path.glob("*.vectorizer.pkl"))) == 1
+
+    address_matcher._vectorizer_cache.clear()
+    loaded_vectorizer, loaded_matrix = address_matcher.get_district_vectorizer(DISTRICT)
+    assert loaded_vectorizer is not vectorizer
+    assert (loaded_matrix != matrix).nnz == 0
+    assert loaded_vectorizer.vocabulary_ == vectorizer.vocabulary_
+
+def test_match_memo_roundtrip_and_version(tmp_path, monkeypatch):
+    monkeypatch.setattr(address_matcher, "MATCHER_DIR", tmp_path)
+    memo = {"서울시 중구 을지로3가 101": ("서울 중구 을지로3가", 1.0, "token"), "부산시 해운대구 우동 1": (None, 0.0, "no_block")}
+    assert address_matcher.save_match_memo("v1", memo)
+    assert address_matcher.load_match_memo("v1") == memo
+    assert address_matcher.load_match_memo("v2") == {}
+
+def test_memo_version_covers_threshold_and_matcher(monkeypatch):
+    key = address_matcher.memo_version("corpus", 0.5)
+    assert address_matcher.memo_version("corpus", 0.5) == key
+    assert address_matcher.memo_version("corpus", 0.6) != key
+    assert address_matcher.memo_version("other", 0.5) != key
+    monkeypatch.setattr(address_matcher, "MATCHER_VERSION", address_matcher.MATCHER_VERSION + 1)
+    assert address_matcher.memo_version("corpus", 0.5) != key
+
+def test_score_histogram_bins():
+    hist = address_matcher.score_histogram([0.0, 0.05, 0.55, 1.0, 1.0])
+    assert len(hist) == 10
+    assert hist['0.0-0.1'] == 2 and hist['0.5-0.6'] == 1 and hist['0.9-1.0'] == 2
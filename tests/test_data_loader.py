@@ -0,0 +1,83 @@
+import io
+import zipfile
+import pandas as pd
+import pytest
+
+try:
+    from src import address_matcher, data_loader
+except Exception:  # streamlit missing (or shadowed by the repo-root streamlit.py)
+    pytest.skip("src.data_loader needs streamlit", allow_module_level=True)
+
+COLUMNS = ['개방자치단체코드', '관리번호', '사업장명', '소재지전체주소', '영업상태명', '업태구분명',
+           '인허가일자', '폐업일자', '소재지면적', '총면적', '소재지전화']
+
+def _row(code, no, name, address, status='영업/정상', permit='2025-01-01'):
+    return [code, no, name, address, status, '일반음식점', permit, '', '50', '', '02-123-4567']
+
+def _zip(tmp_path, name, rows):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, 'w') as zf:
+        zf.writestr('일반음식점.csv', pd.DataFrame(rows, columns=COLUMNS).to_csv(index=False).encode('cp949'))
+    path = tmp_path / name
+    path.write_bytes(buf.getvalue())
+    return str(path)
+
+@pytest.fixture
+def district(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_loader, 'SNAPSHOT_CACHE_ENABLED', False)
+    monkeypatch.setattr(address_matcher, 'MATCHER_DIR', tmp_path / 'matcher')
+    path = tmp_path / 'district.xlsx'
+    pd.DataFrame({
+        '관리지사': ['중앙지사', '강북지사'], '영업구역 수정': ['G1', 'G2'], 'SP담당': ['김민수', '이영희'],
+        '주소시': ['서울', '서울'], '주소군구': ['동대문구', '강북구'], '주소동': ['용두동', '미아동'],
+    }).to_excel(path, index=False)
+    return str(path)
+
+def test_delta_matches_full_rebuild(tmp_path, district):
+    a = _row('3000000', '1', '용두식당', '서울특별시 동대문구 용두동 10', permit='2024-03-01')
+    b = _row('3000000', '2', '미아분식', '서울특별시 강북구 미아동 20', permit='2024-05-01')
+    c = _row('3000000', '3', '폐업식당', '서울특별시 강북구 미아동 30', permit='2024-07-01')
+    b_updated = _row('3000000', '2', '미아분식', '서울특별시 강북구 미아동 20', status='폐업', permit='2024-05-01')
+    d = _row('3000000', '4', '신규카페', '서울특별시 동대문구 용두동 40', permit='2026-01-05')
+    # Different 관리번호, same (사업장명, 소재지전체주소) as a: dropped like in a full load
+    e = _row('3000000', '5', '용두식당', '서울특별시 동대문구 용두동 10', permit='2026-01-06')
+
+    base_df, mgr_info, error = data_loader.load_and_process_data(_zip(tmp_path, 'base.zip', [a, b, c]), district)
+    assert error is None
+
+    delta_dir = tmp_path / '변동분'
+    delta_dir.mkdir()
+    delta_rows = [r + [kind, '2026-01-10'] for r, kind in [(b_updated, 'U'), (c, 'D'), (d, 'I'), (e, 'I')]]
+    pd.DataFrame(delta_rows, columns=COLUMNS + data_loader.DELTA_PATTERNS).to_csv(
+        delta_dir / '변동.csv', index=False, encoding='cp949')
+    delta_df, _, error = data_loader.apply_delta_batch(base_df, mgr_info, data_loader.list_delta_files(str(delta_dir)), district)
+    assert error is None
+
+    full_df, _, error = data_loader.load_and_process_data(_zip(tmp_path, 'full.zip', [a, b_updated, d, e]), district)
+    assert error is None
+
+    key = ['개방자치단체코드', '관리번호']
+    cols = sorted(full_df.columns)
+    assert sorted(delta_df.columns) == cols
+    pd.testing.assert_frame_equal(
+        delta_df[cols].sort_values(key).reset_index(drop=True),
+        full_df[cols].sort_values(key).reset_index(drop=True),
+        check_categorical=False,
+    )
+    assert not delta_df.duplicated(['사업장명', '소재지전체주소']).any()
+
+    # The delta report counts every row of the result, not just the upserted ones
+    report, full_report = delta_df.attrs['match_report'], full_df.attrs['match_report']
+    for field in ('rows', 'no_address', 'matched_rows', 'unmatched_rows', 'outcomes'):
+        assert report[field] == full_report[field]
+    assert report['outcomes']['token'] == len(delta_df)
+
+def test_histogram_leaves_out_unscored_addresses():
+    df = pd.DataFrame({'소재지전체주소_norm': ['a', 'a', 'b', 'c', 'd'],
+                       'matched_address': ['서울 동대문구 용두동', '서울 동대문구 용두동', None, None, None]})
+    memo = {'a': ('서울 동대문구 용두동', 0.8, 'cosine'), 'b': (None, 0.0, 'no_block'),
+            'c': (None, 0.7, 'dong_mismatch'), 'd': (None, 0.3, 'below_threshold')}
+    report = data_loader._match_outcomes(df, memo)
+    assert report['outcomes']['no_block'] == 1 and report['outcomes']['cosine'] == 2
+    assert sum(report['score_histogram'].values()) == 3
+    assert report['score_histogram']['0.0-0.1'] == 0
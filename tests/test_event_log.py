@@ -0,0 +1,104 @@
+import json
+import os
+import time
+from src import event_log
+
+def test_append_and_tail(tmp_path):
+    path = tmp_path / 'view_logs.jsonl'
+    event_log.append(path, [{'i': i, 'details': '강남구'} for i in range(10)])
+    event_log.append(path, [{'i': 10}])
+    assert [e['i'] for e in event_log.tail(path, 3)] == [8, 9, 10]
+    assert [e['i'] for e in event_log.tail(path, 50)] == list(range(11))
+    assert event_log.tail(tmp_path / 'missing.jsonl', 5) == []
+
+def test_tail_reads_backwards_across_blocks(tmp_path, monkeypatch):
+    monkeypatch.setattr(event_log, '_TAIL_BLOCK', 16)
+    path = tmp_path / 'access_logs.jsonl'
+    event_log.append(path, [{'i': i, 'pad': 'x' * (i % 7)} for i in range(100)])
+    assert [e['i'] for e in event_log.tail(path, 7)] == list(range(93, 100))
+
+def test_size_rotation_gzip_and_retention(tmp_path, monkeypatch):
+    monkeypatch.setattr(event_log, 'LOG_ROTATE_BYTES', 200)
+    monkeypatch.setattr(event_log, 'LOG_GZIP', True)
+    path = tmp_path / 'change_history.jsonl'
+    for i in range(30):
+        event_log.append(path, [{'i': i, 'record_key': f'k{i % 3}'}])
+    segments = event_log._segments(path)
+    assert segments and all(s.suffix == '.gz' for s in segments)
+    assert [e['i'] for e in event_log.read_all(path)] == list(range(30))
+    assert [e['i'] for e in event_log.tail(path, 12)] == list(range(18, 30))
+
+    # Segments past the retention window are deleted on the next rotation
+    old = time.time() - (event_log.LOG_RETENTION_DAYS + 1) * 86400
+    for segment in segments:
+        os.utime(segment, (old, old))
+    event_log.rotate(path, force=True)
+    assert len(event_log._segments(path)) == 1
+
+def test_migrate_json_list(tmp_path):
+    json_path = tmp_path / 'access_logs.json'
+    json_path.write_text(json.dumps([{'user_name': '관리자'}, {'user_name': '김민수'}]), encoding='utf-8')
+    path = tmp_path / 'access_logs.jsonl'
+    event_log.migrate_json_list(json_path, path)
+    event_log.append(path, [{'user_name': '이영희'}])
+    event_log.migrate_json_list(json_path, path)  # already converted
+    assert [e['user_name'] for e in event_log.tail(path, 10)] == ['관리자', '김민수', '이영희']
+
+def test_keyed_page_follows_appends_and_rotation(tmp_path):
+    path = tmp_path / 'change_history.jsonl'
+    event_log.append(path, [{'record_key': 'a', 'i': 0}, {'record_key': 'b', 'i': 1}])
+    assert [e['i'] for e in event_log.keyed_page(path, 'record_key', 'a')[0]] == [0]
+    event_log.append(path, [{'record_key': 'a', 'i': 2}])
+    assert [e['i'] for e in event_log.keyed_page(path, 'record_key', 'a')[0]] == [2, 0]
+    event_log.rotate(path, force=True)
+    event_log.append(path, [{'record_key': 'a', 'i': 3}])
+    assert [e['i'] for e in event_log.keyed_page(path, 'record_key', 'a')[0]] == [3, 2, 0]
+    assert [e['i'] for e in event_log.keyed_page(path, 'record_key', 'b')[0]] == [1]
+    assert [e['i'] for e in event_log.keyed_page(path, 'record_key')[0]] == [3, 2, 1, 0]
+
+def test_keyed_page_cursor_survives_rotation_and_prune(tmp_path, monkeypatch):
+    monkeypatch.setattr(event_log, 'LOG_GZIP', True)
+    path = tmp_path / 'change_history.jsonl'
+    for i in range(12):
+        event_log.append(path, [{'record_key': 'k' if i % 4 else 'other', 'i': i}])
+        if i in (3, 7):
+            event_log.rotate(path, force=True)
+
+    page, cursor = event_log.keyed_page(path, 'record_key', 'k', limit=3)
+    assert [e['i'] for e in page] == [11, 10, 9]
+    # The live file holding the cursor entry is rotated (and gzipped) and the oldest segment pruned
+    event_log.rotate(path, force=True)
+    event_log.append(path, [{'record_key': 'k', 'i': 12}])
+    old = time.time() - (event_log.LOG_RETENTION_DAYS + 1) * 86400
+    os.utime(event_log._segments(path)[-1], (old, old))
+    event_log._prune_segments(path)
+
+    page, cursor = event_log.keyed_page(path, 'record_key', 'k', limit=3, cursor=cursor)
+    # 4 (not 'k') and the pruned segment's entries are older: no further page
+    assert [e['i'] for e in page] == [7, 6, 5] and cursor is None
+
+    # A cursor into a pruned segment has nothing older left
+    page, cursor = event_log.keyed_page(path, 'record_key', 'k', limit=1)
+    while cursor is not None:
+        last_cursor = cursor
+        page, cursor = event_log.keyed_page(path, 'record_key', 'k', limit=1, cursor=cursor)
+    for segment in event_log._segments(path):
+        os.utime(segment, (old, old))
+    event_log._prune_segments(path)
+    assert event_log.keyed_page(path, 'record_key', 'k', limit=1, cursor=last_cursor) == ([], None)
+
+def test_keyed_page_cursor_with_identical_first_entries(tmp_path):
+    path = tmp_path / 'change_history.jsonl'
+    same = {'timestamp': '2026-01-15 10:00:00', 'record_key': 'k', 'new_status': '🟢 계약완료'}
+    for i in range(3):
+        # Every segment starts with the same entry (same change saved in the same second)
+        event_log.append(path, [same, {'timestamp': '2026-01-15 10:00:00', 'record_key': 'k', 'i': i}])
+        event_log.rotate(path, force=True)
+    seen, cursor = [], None
+    while True:
+        page, cursor = event_log.keyed_page(path, 'record_key', 'k', limit=1, cursor=cursor)
+        seen += [e.get('i', '-') for e in page]
+        if cursor is None:
+            break
+    assert seen == [2, '-', 1, '-', 0, '-']
+    assert len({e['record_key'] for e in event_log.read_all(path)}) == 1
@@ -0,0 +1,67 @@
+import datetime
+import numpy as np
+import pandas as pd
+from src import filter_index
+
+def _df():
+    return pd.DataFrame({
+        '관리지사': pd.Categorical(['중앙지사', '강북지사', '미지정', '중앙지사', '강북지사']),
+        'SP담당': ['김민수', '이영희', '미지정', '김민수', None],
+        '영업상태명': ['영업/정상', '폐업', '영업/정상', '휴업', '영업/정상'],
+        '업태구분명': ['한방병원', '일반음식점', '의원', '카페', None],
+        '소재지면적': np.array([400.0, 330.58, 12.5, np.nan, 1000.0], dtype='float32'),
+        '소재지전화': ['02-1', '', None, '031-2', '033-3'],
+        '인허가일자': pd.to_datetime(['2024-01-05', '2024-01-30', '2023-12-01', None, '2024-02-01']),
+        '폐업일자': pd.to_datetime([None, '2024-03-01', None, None, None]),
+        '최종수정시점': pd.to_datetime(['2024-01-05 09:00', '2024-03-01 10:00', '2023-12-01 00:00', None, '2024-02-01 18:30']),
+    })
+
+def test_masks_match_pandas_filters():
+    df = _df()
+    idx = filter_index.build_filter_index(df)
+    rows = lambda bm: filter_index.to_bool(idx, bm).tolist()
+
+    assert rows(filter_index.values_mask(idx, '관리지사', '중앙지사')) == (df['관리지사'] == '중앙지사').tolist()
+    assert rows(filter_index.values_mask(idx, 'SP담당', ['김민수', '이영희'])) == df['SP담당'].isin(['김민수', '이영희']).tolist()
+    not_unassigned = filter_index.invert(idx, filter_index.values_mask(idx, '관리지사', '미지정'))
+    assert rows(not_unassigned) == (df['관리지사'] != '미지정').tolist()
+    assert filter_index.count(not_unassigned) == 4
+    assert rows(filter_index.ym_mask(idx, '인허가일자', 202401)) == (df['인허가일자'].dt.strftime('%Y-%m') == '2024-01').tolist()
+    assert filter_index.ym_options(idx, '인허가일자') == [202402, 202401, 202312]
+    assert filter_index.format_ym(202312) == '2023-12' and filter_index.format_ym("전체") == "전체"
+    assert rows(filter_index.flag_mask(idx, 'hospital')) == df['업태구분명'].astype(str).str.contains('병원|의원', na=False).tolist()
+    assert rows(filter_index.flag_mask(idx, 'large_area')) == [True, True, False, False, True]
+    assert rows(filter_index.flag_mask(idx, 'has_phone')) == [True, False, False, True, True]
+    in_range = filter_index.date_range_mask(idx, datetime.date(2024, 1, 1), datetime.date(2024, 3, 1))
+    assert rows(in_range) == [True, True, False, False, True]
+
+def test_missing_modified_date_counts_as_today():
+    idx = filter_index.build_filter_index(_df())
+    rows = lambda bm: filter_index.to_bool(idx, bm).tolist()
+    today = datetime.date(2024, 2, 15)
+    assert rows(filter_index.date_range_mask(idx, datetime.date(2024, 2, 1), datetime.date(2024, 2, 28), today=today)) == [False, False, False, True, True]
+    assert rows(filter_index.date_range_mask(idx, datetime.date(2024, 3, 1), datetime.date(2024, 3, 31), today=today)) == [False, True, False, False, False]
+
+def test_nfd_values_share_the_nfc_key():
+    import unicodedata
+    df = pd.DataFrame({'관리지사': [unicodedata.normalize('NFD', '강북지사'), '강북지사', '중앙지사']})
+    idx = filter_index.build_filter_index(df)
+    assert filter_index.to_bool(idx, filter_index.values_mask(idx, '관리지사', '강북지사')).tolist() == [True, True, False]
+    assert filter_index.count(filter_index.values_mask(idx, '관리지사', '없는지사')) == 0
+
+def test_nfc_columns_are_keyed_as_is():
+    import unicodedata
+    nfd = unicodedata.normalize('NFD', '강북지사')
+    df = pd.DataFrame({'관리지사': [nfd, '강북지사'], 'SP담당': [nfd, '강북지사']})
+    idx = filter_index.build_filter_index(df, nfc_columns=['관리지사'])
+    assert set(idx['values']['관리지사']) == {nfd, '강북지사'}
+    assert set(idx['values']['SP담당']) == {'강북지사'}
+
+def test_ym_key_columns_are_used_when_present():
+    df = _df()
+    df['인허가년월'] = filter_index.ym_key(df['인허가일자'])
+    assert df['인허가년월'].dtype == 'int32'
+    assert df['인허가년월'].tolist() == [202401, 202401, 202312, 0, 202402]
+    idx = filter_index.build_filter_index(df.drop(columns=['인허가일자']))
+    assert filter_index.to_bool(idx, filter_index.ym_mask(idx, '인허가일자', 202401)).tolist() == [True, True, False, False, False]
+    assert filter_index.ym_options(idx, '인허가일자') == [202402, 202401, 202312]
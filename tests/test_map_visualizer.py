@@ -0,0 +1,35 @@
+import pandas as pd
+import pytest
+
+try:
+    from src import data_loader, map_visualizer
+except Exception:  # streamlit missing (or shadowed by the repo-root streamlit.py)
+    pytest.skip("src.map_visualizer needs streamlit", allow_module_level=True)
+
+@pytest.fixture
+def compact_df():
+    # Same dtypes as a loaded dataset: categorical text with missing values, float32 coordinates
+    df = pd.DataFrame({
+        '사업장명': ['용두식당', '미아분식'], '소재지전체주소': ['서울특별시 동대문구 용두동 10', None],
+        '소재지전화': ['02-123-4567', None], '영업상태명': ['영업/정상', None], '업태구분명': [None, '분식'],
+        '관리지사': ['중앙지사', None], 'SP담당': [None, '이영희'], '영업구역 수정': ['G1', None],
+        '인허가일자': ['2024-03-01', '2024-05-01'], '폐업일자': [None, '2025-01-02'],
+        '소재지면적': ['50', '400'], '평수': [15.1, 121.0], 'lat': [37.57, 37.61], 'lon': [127.03, 127.02],
+    })
+    df = data_loader._compact_dtypes(df)
+    assert df['영업상태명'].dtype == 'category'
+    return df
+
+@pytest.fixture
+def rendered(monkeypatch):
+    pages = []
+    monkeypatch.setattr(map_visualizer.components, 'html', lambda html, **kwargs: pages.append(html))
+    return pages
+
+def test_render_folium_map_on_compact_dtypes(compact_df, rendered):
+    map_visualizer.render_folium_map(compact_df)
+    assert len(rendered) == 1 and '미아분식' in rendered[0]
+
+def test_render_kakao_map_on_compact_dtypes(compact_df, rendered):
+    map_visualizer.render_kakao_map(compact_df, 'test-key')
+    assert len(rendered) == 1 and '용두식당' in rendered[0]
@@ -0,0 +1,45 @@
+import unicodedata
+import pandas as pd
+from src import search_index
+
+def _df():
+    return pd.DataFrame({
+        '사업장명': ['스타벅스 강남점', 'Cafe ABC', '김밥천국', None, '강남 한의원'],
+        '소재지전체주소': ['서울특별시 강남구 역삼동 1', '부산광역시 해운대구 우동 2', '서울특별시 마포구 서교동 3', '강원도 춘천시 4', '서울특별시 강남구 논현동 5'],
+    }, index=[10, 11, 12, 13, 14])
+
+def _contains(df, keyword):
+    return (df['사업장명'].astype(str).str.lower().str.contains(keyword, regex=False)
+            | df['소재지전체주소'].astype(str).str.lower().str.contains(keyword, regex=False))
+
+def test_keywords_match_str_contains():
+    df = _df()
+    idx = search_index.build_search_index(df)
+    for keyword in ['강남', '강남구 역삼', '김', 'cafe', 'abc', '특별시', '없는말', '4']:
+        for kw in search_index.split_keywords(keyword):
+            assert search_index.search(idx, [kw]).tolist() == _contains(df, kw).tolist(), kw
+
+def test_or_and_modes():
+    df = _df()
+    idx = search_index.build_search_index(df)
+    keywords = search_index.split_keywords('강남/마포')
+    assert search_index.search(idx, keywords, mode='or').tolist() == [True, False, True, False, True]
+    keywords = search_index.split_keywords('강남 한의원')
+    assert search_index.search(idx, keywords, mode='and').tolist() == [False, False, False, False, True]
+
+def test_nfd_input_and_frame_subset():
+    df = _df()
+    df.loc[12, '사업장명'] = unicodedata.normalize('NFD', '김밥천국')
+    idx = search_index.build_search_index(df)
+    keywords = search_index.split_keywords(unicodedata.normalize('NFD', '김밥'))
+    assert search_index.search(idx, keywords).tolist() == [False, False, True, False, False]
+    subset = df.loc[[14, 12, 10]]
+    assert search_index.filter_frame(idx, subset, search_index.split_keywords('서울 강남'), mode='and').index.tolist() == [14, 10]
+    assert search_index.filter_frame(idx, subset, []) is subset
+
+def test_nfc_columns_skip_normalization():
+    df = _df()
+    df.loc[12, '사업장명'] = unicodedata.normalize('NFD', '김밥천국')
+    idx = search_index.build_search_index(df, nfc_columns=['사업장명'])
+    assert idx['texts']['사업장명'][2] == df.loc[12, '사업장명']
+    assert search_index.search(idx, ['서울']).tolist() == search_index.search(search_index.build_search_index(df), ['서울']).tolist()
@@ -0,0 +1,25 @@
+import pandas as pd
+from src import snapshot_cache
+
+def test_snapshot_roundtrip(tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshot_cache, "SNAPSHOT_DIR", tmp_path)
+    zip_file = tmp_path / "a.zip"
+    zip_file.write_bytes(b"zip-bytes")
+
+    key = snapshot_cache.compute_snapshot_key(str(zip_file))
+    assert snapshot_cache.load_snapshot(key) is None
+
+    df = pd.DataFrame({"사업장명": ["가게"], "lat": [37.5], "인허가일자": pd.to_datetime(["2026-01-02"])})
+    mgr_info = [{"SP담당": "홍길동", "관리지사": "중앙지사"}]
+    assert snapshot_cache.save_snapshot(key, df, mgr_info)
+
+    loaded_df, loaded_mgr = snapshot_cache.load_snapshot(key)
+    pd.testing.assert_frame_equal(loaded_df, df)
+    assert loaded_mgr == mgr_info
+
+def test_snapshot_key_changes_with_content(tmp_path):
+    f = tmp_path / "dist.xlsx"
+    f.write_bytes(b"v1")
+    k1 = snapshot_cache.compute_snapshot_key(str(f))
+    f.write_bytes(b"v2")
+    assert snapshot_cache.compute_snapshot_key(str(f)) != k1
@@ -12,7 +12,38 @@ def test_mask_name():
     assert mask_name("남궁민수") == "남**수"
 
 def test_normalize_address():
-    assert normalize_address("서울특별시 강남구") == "서울시 강남구"
-    assert normalize_address("강원특별자치도 춘천시") == "강원도 춘천시"
-    assert normalize_address("  서울시  ") == "서울시"
-    assert normalize_address("아파트(101동)") == "아파트"
+    assert normalize_address("서울특별시 강남구", min_length=0) == "서울시 강남구"
+    assert normalize_address("강원특별자치도 춘천시", min_length=0) == "강원도 춘천시"
+    assert normalize_address("  서울시  ", min_length=0) == "서울시"
+    assert normalize_address("아파트(101동)", min_length=0) == "아파트"
+
+    # Default MIN_ADDRESS_LENGTH, the path the loader uses (through normalize_address_series)
+    from src.utils import normalize_address_series
+    defaults = ["서울특별시 강남구", "강원특별자치도 춘천시", "  서울시  ", "아파트(101동)", "강원특별자치도 춘천시 중앙로 1"]
+    assert [normalize_address(a) for a in defaults] == [None, None, None, None, "강원도 춘천시 중앙로 1"]
+    assert normalize_address_series(pd.Series(defaults)).tolist() == [normalize_address(a) for a in defaults]
+
+def test_normalize_address_series_matches_scalar():
+    from src.utils import normalize_address_series
+    samples = pd.Series([
+        "서울특별시 강남구", "강원특별자치도 춘천시 중앙로 1", "  서울시  ", "아파트(101동)",
+        "세종특별자치시 한누리대로 2130(보람동)", "경기도 성남시  분당구 1-2", "서울시 ***구",
+        "경기도   용인시 -- 수지구", None, float('nan'), 12345678, "",
+    ])
+    for min_length in (0, 8):
+        expected = [normalize_address(a, min_length) for a in samples]
+        assert normalize_address_series(samples, min_length).tolist() == expected
+
+def test_get_best_matches_agrees_with_single():
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from src.utils import get_best_match, get_best_matches
+    choices = ["서울시 강남구 역삼동", "서울시 강남구 삼성동", "경기도 성남시 분당구 정자동",
+               "강원도 춘천시 효자동", "경기도 수원시 팔달구 인계동", "서울시 종로구 청운동"]
+    vectorizer = TfidfVectorizer(analyzer='char', ngram_range=(2, 3)).fit(choices)
+    tfidf_matrix = vectorizer.transform(choices)
+    queries = ["서울시 강남구 역삼동 123", "경기도 성남시 분당구 정자동", "강원도 춘천시 효자2동",
+               "부산시 해운대구 우동", None, "서울 종로구 청운동"]
+    matches, scores, stages = get_best_matches(queries, choices, vectorizer, tfidf_matrix, chunk_size=2)
+    assert matches == [get_best_match(q, choices, vectorizer, tfidf_matrix) for q in queries]
+    assert stages[1] == 'cosine' and stages[4] == 'missing'
+    assert len(scores) == len(queries)
@@ -7,6 +7,7 @@ from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 from difflib import SequenceMatcher
 import streamlit as st
+from src.utils import get_best_matches
 
 # Check for rapidfuzz for better performance, fallback to difflib
 try:
@@ -289,13 +290,11 @@ def load_and_process_data(zip_file_path_or_obj, district_file_path_or_obj):
     # Match
     target_df = target_df.dropna(subset=['소재지전체주소_norm'])
     
-    def match_row(row):
-        addr = row['소재지전체주소_norm']
-        matched = get_best_match(addr, choices, vectorizer, tfidf_matrix)
-        # Return Original address for merge
-        return norm_to_original.get(matched) if matched else None
-
-    target_df['matched_address'] = target_df.apply(match_row, axis=1)
+    # Match each distinct address once, in batches
+    unique_addrs = target_df['소재지전체주소_norm'].unique().tolist()
+    matched, _, _ = get_best_matches(unique_addrs, choices, vectorizer, tfidf_matrix, min_cosine=0)
+    addr_map = {addr: norm_to_original.get(m) if m else None for addr, m in zip(unique_addrs, matched)}
+    target_df['matched_address'] = target_df['소재지전체주소_norm'].map(addr_map)
     
     # 5. Merge
     # We merge on the original full address since that's what we recovered
@@ -491,12 +490,11 @@ def process_api_data(target_df, district_file_path_or_obj):
     
     target_df = target_df.dropna(subset=['소재지전체주소_norm'])
     
-    def match_row(row):
-        addr = row['소재지전체주소_norm']
-        matched = get_best_match(addr, choices, vectorizer, tfidf_matrix)
-        return norm_to_original.get(matched) if matched else None
-
-    target_df['matched_address'] = target_df.apply(match_row, axis=1)
+    # Match each distinct address once, in batches
+    unique_addrs = target_df['소재지전체주소_norm'].unique().tolist()
+    matched, _, _ = get_best_matches(unique_addrs, choices, vectorizer, tfidf_matrix, min_cosine=0)
+    addr_map = {addr: norm_to_original.get(m) if m else None for addr, m in zip(unique_addrs, matched)}
+    target_df['matched_address'] = target_df['소재지전체주소_norm'].map(addr_map)
     
     # 5. Merge
     merge_cols = ['full_address', '관리지사', 'SP담당']